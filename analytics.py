@@ -0,0 +1,356 @@
+"""Columnar export of finished games for offline analytics.
+
+Every finished game is appended to a ``ColumnarLog``. A background thread
+buffers rows column by column and writes them out as chunks of NumPy
+``.npy`` files, one file per column, partitioned by day:
+
+    analytics/date=2026-10-18/part-<ms>-<pid>-<n>/attempts.npy
+
+A chunk is written (rotated) when it reaches ``chunk_rows`` games, when
+the day changes, ``max_age`` seconds after its first game, and on flush or
+exit. It is written to a temporary directory that is then renamed into
+place, so readers never see half a chunk, and each worker writes its own
+chunks side by side.
+
+Columns, for a chunk of N games:
+
+    time           float64  when the game finished
+    won            bool
+    daily          bool     a daily challenge game
+    attempts       uint8
+    elapsed_time   uint32   seconds
+    secret         uint32   code index in the game's code space
+    player         int32    index into player_names.npy
+    variant        int16    index into variant_names.npy (variant keys)
+    guess_offsets  int64    N + 1 offsets into the two columns below
+    guesses        uint32   code index of every guess, game after game
+    feedback       uint8    feedback byte of every guess
+
+Run ``python analytics.py`` to aggregate an export: chunks are memory-mapped
+and reduced one at a time with NumPy, never as a dict per game.
+
+    python analytics.py --from 2026-10-01 --player alice
+"""
+import argparse
+import atexit
+import itertools
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from array import array
+from datetime import datetime
+
+import numpy as np
+
+from persistence import WRITE_SECONDS
+from scoring import parse_feedback
+from variants import CLASSIC, variant_from_key
+
+# column -> (array typecode while buffering, dtype on disk)
+COLUMNS = {
+    'time': ('d', np.float64),
+    'won': ('B', np.bool_),
+    'daily': ('B', np.bool_),
+    'attempts': ('B', np.uint8),
+    'elapsed_time': ('I', np.uint32),
+    'secret': ('I', np.uint32),
+    'player': ('i', np.int32),
+    'variant': ('h', np.int16),
+}
+# Longest elapsed time kept exact for the median; longer games count as this
+ELAPSED_CAP = 24 * 3600
+
+_FLUSH = object()
+
+
+def partition_of(time):
+    return 'date=' + datetime.fromtimestamp(time).date().isoformat()
+
+
+class _Chunk:
+    """Rows buffered for one chunk, stored column by column"""
+
+    def __init__(self, partition):
+        self.partition = partition
+        self.started = time.monotonic()
+        self.columns = {name: array(code) for name, (code, _) in COLUMNS.items()}
+        self.guess_offsets = array('q', [0])
+        self.guesses = array('I')
+        self.feedback = array('B')
+        self.names = {'player': {}, 'variant': {}}
+
+    def __len__(self):
+        return len(self.columns['time'])
+
+    def _code(self, column, name):
+        codes = self.names[column]
+        return codes.setdefault(name, len(codes))
+
+    def add(self, summary, player, finished):
+        variant_key = summary.get('variant', CLASSIC.key)
+        space = variant_from_key(variant_key).space
+        # Pack everything before appending, so a bad record adds nothing
+        secret = space.code_index(summary['secret_code'])
+        guesses = [space.code_index(entry['guess']) for entry in summary['guesses']]
+        feedback = [space.encode_feedback(*parse_feedback(entry['feedback']))
+                    for entry in summary['guesses']]
+        self.guesses.extend(guesses)
+        self.feedback.extend(feedback)
+        self.guess_offsets.append(len(self.guesses))
+        columns = self.columns
+        columns['time'].append(finished)
+        columns['won'].append(bool(summary['won']))
+        columns['daily'].append('daily' in summary)
+        columns['attempts'].append(summary['attempts'])
+        columns['elapsed_time'].append(max(0, int(summary.get('elapsed_time', 0))))
+        columns['secret'].append(secret)
+        columns['player'].append(self._code('player', player))
+        columns['variant'].append(self._code('variant', variant_key))
+
+    def arrays(self):
+        out = {name: np.frombuffer(self.columns[name], dtype=COLUMNS[name][0]).astype(dtype)
+               for name, (_, dtype) in COLUMNS.items()}
+        out['guess_offsets'] = np.frombuffer(self.guess_offsets, dtype=np.int64)
+        out['guesses'] = np.frombuffer(self.guesses, dtype=np.uint32)
+        out['feedback'] = np.frombuffer(self.feedback, dtype=np.uint8)
+        for column, codes in self.names.items():
+            out[f'{column}_names'] = np.array(list(codes), dtype=str)
+        return out
+
+
+class ColumnarLog:
+    """Finished games written as day-partitioned .npy chunks by a
+    background thread
+    """
+
+    def __init__(self, root, chunk_rows=65536, max_age=300.0):
+        self.root = root
+        self.chunk_rows = chunk_rows
+        self.max_age = max_age
+        self._queue = queue.Queue()
+        self._chunk = None
+        self._sequence = itertools.count()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def append(self, game_summary, player, finished=None):
+        """Queue a finished game; packing and disk I/O happen in the writer"""
+        self._ensure_writer()
+        self._queue.put((game_summary, player, time.time() if finished is None else finished))
+
+    def flush(self):
+        """Block until every queued game is written, partial chunk included"""
+        if self._thread is None:
+            return
+        self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def _ensure_writer(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name=f'columnar-writer:{self.root}', daemon=True
+                    )
+                    self._thread.start()
+                    atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            timeout = None
+            if self._chunk is not None:
+                timeout = max(0.0, self._chunk.started + self.max_age - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None  # The chunk is max_age old
+            try:
+                if item is None or item is _FLUSH:
+                    self._rotate()
+                else:
+                    self._add(*item)
+            except Exception as e:
+                print(f"Error writing analytics to {self.root}: {e}")
+            finally:
+                if item is not None:
+                    self._queue.task_done()
+
+    def _add(self, summary, player, finished):
+        partition = partition_of(finished)
+        if self._chunk is not None and self._chunk.partition != partition:
+            self._rotate()
+        if self._chunk is None:
+            self._chunk = _Chunk(partition)
+        self._chunk.add(summary, player, finished)
+        if len(self._chunk) >= self.chunk_rows:
+            self._rotate()
+
+    def _rotate(self):
+        chunk, self._chunk = self._chunk, None
+        if not chunk:
+            return
+        directory = os.path.join(self.root, chunk.partition)
+        name = f'part-{int(time.time() * 1000)}-{os.getpid()}-{next(self._sequence)}'
+        tmp_path = os.path.join(directory, f'.{name}.tmp')
+        os.makedirs(tmp_path, exist_ok=True)
+        try:
+            with WRITE_SECONDS.time('analytics', 'write'):
+                for column, values in chunk.arrays().items():
+                    np.save(os.path.join(tmp_path, f'{column}.npy'), values)
+                os.rename(tmp_path, os.path.join(directory, name))
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+
+# Reading
+
+def chunk_paths(root, start=None, end=None):
+    """(day, chunk directory) for the partitions between two ISO dates
+    (inclusive)
+    """
+    try:
+        partitions = sorted(os.listdir(root))
+    except FileNotFoundError:
+        return []
+    paths = []
+    for partition in partitions:
+        day = partition.partition('=')[2]
+        if not partition.startswith('date=') or (start and day < start) or (end and day > end):
+            continue
+        directory = os.path.join(root, partition)
+        paths.extend((day, os.path.join(directory, name)) for name in sorted(os.listdir(directory))
+                     if name.startswith('part-'))
+    return paths
+
+
+def load_chunk(path):
+    """Every column of a chunk, memory-mapped (nothing is read until used)"""
+    return {name[:-4]: np.load(os.path.join(path, name), mmap_mode='r')
+            for name in os.listdir(path) if name.endswith('.npy')}
+
+
+class Aggregate:
+    """Statistics reduced chunk by chunk with NumPy"""
+
+    def __init__(self, player=None):
+        self.player = player
+        self.games = 0
+        self.wins = 0
+        self.attempts = np.zeros(256, dtype=np.int64)  # wins by attempts
+        self.elapsed = np.zeros(ELAPSED_CAP + 1, dtype=np.int64)
+        self.days = {}
+        self.players = {}  # name -> [games, wins]
+        self.openings = np.zeros(CLASSIC.space.size, dtype=np.int64)  # classic first guesses
+
+    def add(self, chunk, day):
+        player_names = list(chunk['player_names'])
+        variant_names = list(chunk['variant_names'])
+        rows = None
+        if self.player is not None:
+            if self.player not in player_names:
+                return
+            rows = np.flatnonzero(chunk['player'] == player_names.index(self.player))
+
+        def column(name):
+            values = chunk[name]
+            return values if rows is None else values[rows]
+
+        won, attempts = column('won'), column('attempts')
+        self.games += len(won)
+        self.wins += int(won.sum())
+        self.attempts += np.bincount(attempts[won], minlength=256)
+        self.elapsed += np.bincount(np.minimum(column('elapsed_time'), ELAPSED_CAP),
+                                    minlength=ELAPSED_CAP + 1)
+
+        self.days[day] = self.days.get(day, 0) + len(won)
+
+        players = column('player')
+        games = np.bincount(players, minlength=len(player_names))
+        wins = np.bincount(players[won], minlength=len(player_names))
+        for code in np.flatnonzero(games):
+            totals = self.players.setdefault(player_names[code], [0, 0])
+            totals[0] += int(games[code])
+            totals[1] += int(wins[code])
+
+        if CLASSIC.key in variant_names:
+            offsets = chunk['guess_offsets']
+            starts = offsets[:-1] if rows is None else offsets[rows]
+            ends = offsets[1:] if rows is None else offsets[rows + 1]
+            classic = (column('variant') == variant_names.index(CLASSIC.key)) & (ends > starts)
+            self.openings += np.bincount(chunk['guesses'][starts[classic]],
+                                         minlength=CLASSIC.space.size)
+
+    def median_elapsed(self):
+        if not self.games:
+            return None
+        return int(np.searchsorted(np.cumsum(self.elapsed), (self.games + 1) // 2))
+
+    def summary(self, top=10):
+        total_attempts = int((np.arange(256) * self.attempts).sum())
+        elapsed_total = int((np.arange(ELAPSED_CAP + 1) * self.elapsed).sum())
+        by_games = sorted(self.players.items(), key=lambda item: -item[1][0])[:top]
+        openings = np.argsort(self.openings)[::-1][:top]
+        return {
+            'games': self.games,
+            'wins': self.wins,
+            'win_rate': round(self.wins / self.games, 4) if self.games else 0.0,
+            'mean_attempts': round(total_attempts / self.wins, 3) if self.wins else None,
+            'wins_by_attempts': {int(a): int(self.attempts[a]) for a in np.flatnonzero(self.attempts)},
+            'mean_elapsed_time': round(elapsed_total / self.games, 1) if self.games else None,
+            'median_elapsed_time': self.median_elapsed(),
+            'games_per_day': dict(sorted(self.days.items())),
+            'top_players': [{'player': name, 'games': games, 'wins': wins}
+                            for name, (games, wins) in by_games],
+            'top_openings': [{'guess': CLASSIC.space.code_string(int(code)),
+                              'games': int(self.openings[code])}
+                             for code in openings if self.openings[code]],
+        }
+
+
+def aggregate(root, start=None, end=None, player=None, top=10):
+    stats = Aggregate(player)
+    paths = chunk_paths(root, start, end)
+    for day, path in paths:
+        stats.add(load_chunk(path), day)
+    return dict(stats.summary(top), chunks=len(paths))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate the columnar game export")
+    parser.add_argument('--dir', default=os.environ.get('ANALYTICS_DIR', 'analytics'))
+    parser.add_argument('--from', dest='start', help="First day (YYYY-MM-DD)")
+    parser.add_argument('--to', dest='end', help="Last day (YYYY-MM-DD)")
+    parser.add_argument('--player', help="Only this nickname's games")
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--json', action='store_true', help="Print the raw JSON")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    stats = aggregate(args.dir, args.start, args.end, args.player, args.top)
+    elapsed = time.perf_counter() - started
+    if args.json:
+        print(json.dumps(stats, indent=2))
+        return
+
+    print(f"{stats['games']:,} games in {stats['chunks']} chunks ({elapsed:.2f} s)")
+    if not stats['games']:
+        return
+    print(f"wins: {stats['wins']:,} ({stats['win_rate']:.1%}), mean attempts {stats['mean_attempts']}")
+    print(f"elapsed time: mean {stats['mean_elapsed_time']} s, median {stats['median_elapsed_time']} s")
+    print("wins by attempts:")
+    for attempts, count in stats['wins_by_attempts'].items():
+        print(f"  {attempts:>3}: {count:>12,}")
+    print("top players:")
+    for entry in stats['top_players']:
+        print(f"  {entry['player']:<20}{entry['games']:>12,} games{entry['wins']:>12,} wins")
+    print("top classic openings:")
+    for entry in stats['top_openings']:
+        print(f"  {entry['guess']}{entry['games']:>12,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,109 +1,197 @@
-from flask import Flask, render_template, jsonify, request, session
-import random
-from datetime import datetime, timedelta
+from flask import Flask, render_template, jsonify, request, session, Response, g
+from datetime import date, datetime
 import os
+import threading
+import time
+import math
 from werkzeug.middleware.proxy_fix import ProxyFix
-import json
-from operator import itemgetter
+from scoring import format_feedback
+from game_state import GameState
+from variants import CLASSIC, variant_from_spec
+import solver
+import opening_book
+from game_store import MemoryGameStore, create_store, new_game_id
+from game_token import GameTokens
+from persistence import JsonlLog, migrate_json
+from analytics import ColumnarLog
+from leaderboard import HallOfFame, Snapshot, window_bucket
+from player_stats import PlayerStats
+from daily import DailyBoard, DailyChallenge, day_name, day_of
+from rooms import Rooms
+from ratelimit import create_limiter, limits_from_environ
+from broadcast import Broadcaster, parse_last_event_id
+from metrics import REGISTRY, Counter, Gauge, Histogram
+import profiler
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'  # Change this to a random secret key
-app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1)
 
-# Store game states
-games = {}
+# Store game states (in-process dict or shared SQLite, see game_store.py)
+GAME_TTL = 3600  # Games expire after 1 hour
+games = create_store()
+# Request, /guess phase and game store metrics for /metrics (see metrics.py)
+REQUESTS = Counter('mastermind_requests_total', 'Requests handled',
+                   labels=('method', 'endpoint', 'status'))
+REQUEST_SECONDS = Histogram('mastermind_request_duration_seconds', 'Time to handle a request',
+                            labels=('method', 'endpoint'))
+GUESS_PHASE_SECONDS = Histogram('mastermind_guess_phase_seconds',
+                                'Time in each phase of /guess; store_update includes validate and evaluate',
+                                labels=('phase',))
+GAMES_EXPIRED = Counter('mastermind_games_expired_total', 'Games evicted after the TTL')
+Gauge('mastermind_active_games', 'Games in the game store',
+      lambda: len(games) if games is not None else None)
+
+# Admission control: per-client token buckets for /new-game and /guess and
+# a cap on active games, checked before any work (see ratelimit.py)
+rate_limits = limits_from_environ()
+limiter = create_limiter() if rate_limits else None
+MAX_ACTIVE_GAMES = int(os.environ.get('MAX_ACTIVE_GAMES', 100_000))
+RATE_LIMITED = Counter('mastermind_rate_limited_total', 'Requests refused with 429',
+                       labels=('endpoint', 'reason'))
+active_games_cache = (0.0, 0)  # (checked at, count)
+# With GAME_STORE=token there is no store: games travel in signed tokens
+# (see game_token.py), so every instance needs the same GAME_TOKEN_KEY. It
+# must be a real secret: whoever has it can read and forge game tokens
+tokens = None
+if games is None:
+    if not os.environ.get('GAME_TOKEN_KEY'):
+        raise RuntimeError("GAME_STORE=token requires the GAME_TOKEN_KEY environment variable")
+    tokens = GameTokens(os.environ['GAME_TOKEN_KEY'], ttl=GAME_TTL)
+NO_GAME = {'error': 'No active game. Please start a new game.'}
 game_history = []  # Initialize as empty list
 hall_of_fame = []  # Initialize hall of fame list
 
-# Load history on startup
-try:
-    if os.path.exists('game_history.json'):
-        with open('game_history.json', 'r') as f:
-            game_history = json.load(f)
-            if not isinstance(game_history, list):
-                game_history = []
-except:
-    game_history = []
-
-# Load hall of fame on startup (add after game_history loading)
-try:
-    if os.path.exists('hall_of_fame.json'):
-        with open('hall_of_fame.json', 'r') as f:
-            hall_of_fame = json.load(f)
-except:
-    hall_of_fame = []
-
-def save_history():
-    try:
-        with open('game_history.json', 'w') as f:
-            json.dump(game_history, f)
-    except Exception as e:
-        print(f"Error saving history: {e}")
-
-def generate_secret_code():
-    """Generate a 4-digit code where:
-    1. No digit repeats
-    2. First digit cannot be 0
-    """
-    # First digit: 1-9
-    first_digit = random.randint(1, 9)
-    
-    # Remaining digits: 0-9 excluding used digits
-    remaining_digits = list(range(10))
-    remaining_digits.remove(first_digit)
-    
-    # Randomly select 3 more unique digits
-    other_digits = random.sample(remaining_digits, 3)
-    
-    # Combine first digit with other digits
-    secret_code = [first_digit] + other_digits
-    return secret_code
-
-def validate_guess(guess):
-    """Validate that the guess follows the rules:
-    1. Must be 4 digits
-    2. No repeating digits
-    3. Cannot start with 0
-    Returns: (bool, str) - (is_valid, error_message)
-    """
-    if len(guess) != 4 or not guess.isdigit():
-        return False, "Please enter exactly 4 digits"
-    
-    if guess[0] == '0':
-        return False, "Number cannot start with 0"
-    
-    if len(set(guess)) != 4:
-        return False, "Digits cannot repeat"
-    
-    return True, ""
+# Finished games and hall of fame entries are appended to JSON Lines logs
+# by a background writer (see persistence.py)
+history_log = JsonlLog('game_history.jsonl')
+fame_log = JsonlLog('hall_of_fame.jsonl')
+stats_log = JsonlLog('player_stats.jsonl')
+daily_log = JsonlLog('daily_results.jsonl')
+# Every finished game, as day-partitioned columnar .npy chunks for offline
+# analysis with `python analytics.py` (see analytics.py); ANALYTICS_DIR=off
+# disables the export
+ANALYTICS_DIR = os.environ.get('ANALYTICS_DIR', 'analytics')
+analytics_log = ColumnarLog(ANALYTICS_DIR) if ANALYTICS_DIR != 'off' else None
 
-def evaluate_guess(secret_code, guess):
-    correct_position = 0
-    correct_digit = 0
-    
-    # Convert guess to list of integers
-    guess = [int(d) for d in guess]
-    
-    # Check for correct positions
-    for i in range(4):
-        if guess[i] == secret_code[i]:
-            correct_position += 1
-    
-    # Check for correct digits in wrong positions
-    guess_copy = guess.copy()
-    secret_copy = secret_code.copy()
-    
-    for i in range(3, -1, -1):
-        if guess_copy[i] == secret_copy[i]:
-            guess_copy.pop(i)
-            secret_copy.pop(i)
-    
-    for digit in guess_copy:
-        if digit in secret_copy:
-            correct_digit += 1
-            secret_copy.remove(digit)
-    
-    return correct_position, correct_digit
+# All-time, daily and weekly top 10 plus per-player bests (see leaderboard.py)
+hall = HallOfFame(size=10)
+# Running per-nickname aggregates for /stats (see player_stats.py)
+player_stats = PlayerStats()
+# Daily challenge: one seeded secret per day, its solver data computed once
+# and cached on disk for every worker, and the day's board (see daily.py).
+# The secrets derive from DAILY_SEED, so without one there is no challenge:
+# anything public (like the secret key above) would give every day away
+DAILY_SEED = os.environ.get('DAILY_SEED')
+if DAILY_SEED:
+    daily = DailyChallenge(DAILY_SEED, os.environ.get('DAILY_CACHE_DIR', 'daily_cache'))
+else:
+    daily = None
+    print("Warning: DAILY_SEED is not set, the daily challenge is disabled")
+DAILY_DISABLED = {'error': 'The daily challenge is not enabled on this server'}
+daily_board = DailyBoard(size=10)
+# Race rooms: many players against one shared secret, kept in this
+# process (see rooms.py)
+rooms = Rooms(max_rooms=int(os.environ.get('MAX_ROOMS', 10_000)),
+              max_players=int(os.environ.get('ROOM_MAX_PLAYERS', 50)), ttl=GAME_TTL)
+Gauge('mastermind_active_rooms', 'Open race rooms', lambda: len(rooms))
+# Whatever the game store: token mode has no game sweeper
+rooms.start_sweeper()
+if games is not None:
+    games.start_sweeper(GAME_TTL, on_expire=lambda removed: GAMES_EXPIRED.inc(amount=removed))
+
+# Serverless platforms start a process per cold request, so with
+# LAZY_STARTUP=1 (the default on Vercel, which sets VERCEL=1) the logs are
+# read on first use by load_state() rather than at import. They are not
+# compacted then: a serverless deployment directory is read-only.
+LAZY_STARTUP = os.environ.get('LAZY_STARTUP', os.environ.get('VERCEL', '0')) == '1'
+# An open /events stream would hold a serverless invocation until the
+# platform timeout, then reconnect: there the page keeps to the
+# leaderboard_version check instead, and the streams answer 204
+LIVE_EVENTS = not LAZY_STARTUP
+state_lock = threading.Lock()
+state_loaded = False
+
+def rebuild_hall_of_fame(records):
+    """Replay logged wins into the leaderboards, keep only what they retain"""
+    for record in records:
+        hall.add(record)
+    return hall.retained()
+
+# Last games and leaderboards, serialized once per change for /leaderboard.
+# Writers hold leaderboard_lock and swap in new lists (copy-on-write), so
+# readers never need the lock.
+leaderboard_lock = threading.RLock()
+leaderboard_snapshot = Snapshot()
+events = Broadcaster()
+snapshot_day = None
+
+# Optional sampling profiler, enabled by PROFILE_INTERVAL (see profiler.py)
+sampling_profiler = profiler.start_from_environ()
+
+def publish_leaderboard():
+    """Rebuild the /leaderboard payload after history or hall of fame change"""
+    global snapshot_day
+    with leaderboard_lock:
+        now = datetime.now().timestamp()
+        snapshot_day = window_bucket('daily', now)
+        return leaderboard_snapshot.publish({
+            'last_games': game_history[:5],
+            'hall_of_fame': hall_of_fame,
+            'daily': hall.top('daily', now),
+            'weekly': hall.top('weekly', now),
+            'daily_challenge': daily_board.top(day_of(now))
+        })
+
+def load_log(log, reduce):
+    """Compact a log at startup; lazy starts only read it"""
+    if LAZY_STARTUP:
+        return reduce(log.read())
+    return log.compact(reduce)
+
+def load_state():
+    """Load history, leaderboards, player stats and daily results, once"""
+    global game_history, hall_of_fame, state_loaded
+    with state_lock:
+        if state_loaded:
+            return
+        # Load history, compacting the logs to what is kept in memory
+        try:
+            migrate_json(history_log, 'game_history.json', newest_first=True)
+            if LAZY_STARTUP:
+                game_history = history_log.tail(5)[::-1]
+            else:
+                game_history = history_log.compact(lambda records: records[-5:])[::-1]
+        except Exception as e:
+            print(f"Error loading history: {e}")
+            game_history = []
+        
+        # Load hall of fame
+        try:
+            migrate_json(fame_log, 'hall_of_fame.json')
+            load_log(fame_log, rebuild_hall_of_fame)
+            hall_of_fame = hall.top()
+        except Exception as e:
+            print(f"Error loading hall of fame: {e}")
+            hall_of_fame = []
+        
+        # Load player stats, compacting the log to the latest record per player
+        try:
+            load_log(stats_log, player_stats.load)
+        except Exception as e:
+            print(f"Error loading player stats: {e}")
+        
+        # Load today's daily challenge results, dropping earlier days
+        try:
+            load_log(daily_log, daily_board.load)
+        except Exception as e:
+            print(f"Error loading daily results: {e}")
+        
+        publish_leaderboard()
+        state_loaded = True
+
+if not LAZY_STARTUP:
+    load_state()
 
 # Add this function to manage history size
 def cleanup_history():
@@ -111,150 +199,537 @@ def cleanup_history():
     global game_history
     if len(game_history) > 5:
         game_history = game_history[:5]
-        save_history()
 
 # Add this function to manage hall of fame
-def update_hall_of_fame(game_summary):
-    """Update hall of fame with best games"""
+def update_hall_of_fame(game_summary, player='Anonymous'):
+    """Update hall of fame with best games.
+    Returns (fame_entry, changes) with changes as from HallOfFame.add
+    """
     global hall_of_fame
-    if game_summary['won']:
+    # Attempts are only comparable between classic games, and daily games
+    # share one secret, so a single win would hand everyone the code
+    if game_summary['won'] and 'variant' not in game_summary and 'daily' not in game_summary:
         fame_entry = {
             'attempts': game_summary['attempts'],
             'secret_code': game_summary['secret_code'],
             'timestamp': game_summary['timestamp'],
-            'player': session.get('nickname', 'Anonymous')  # Use nickname from session
+            'player': player,
+            'time': datetime.now().timestamp()
         }
-        hall_of_fame.append(fame_entry)
-        # Sort by attempts (ascending) and timestamp (descending)
-        hall_of_fame.sort(key=lambda x: (x['attempts'], -datetime.strptime(x['timestamp'], '%Y-%m-%d %H:%M').timestamp()))
-        # Keep only top 10
-        hall_of_fame = hall_of_fame[:10]
-        save_hall_of_fame()
-
-def save_hall_of_fame():
-    """Save hall of fame to a file"""
-    try:
-        with open('hall_of_fame.json', 'w') as f:
-            json.dump(hall_of_fame, f)
-    except Exception as e:
-        print(f"Error saving hall of fame: {e}")
+        # Only entries that made a board or a player's best need persisting
+        changes = hall.add(fame_entry)
+        if changes:
+            fame_log.append(fame_entry)
+            hall_of_fame = hall.top()
+        return fame_entry, changes
+    return None, {}
+
+def active_game_count():
+    """Number of stored games. COUNT(*) on the SQLite store is not free,
+    so it is refreshed at most once a second
+    """
+    global active_games_cache
+    if isinstance(games, MemoryGameStore):
+        return len(games)
+    now = time.monotonic()
+    if now - active_games_cache[0] >= 1.0:
+        active_games_cache = (now, len(games))
+    return active_games_cache[1]
+
+def admission_check(endpoint, client):
+    """Decide whether to serve a 'new_game' or 'guess' request before doing
+    any work. Returns None, or (payload, retry_after) for a 429
+    """
+    if (endpoint == 'new_game' and games is not None and MAX_ACTIVE_GAMES
+            and active_game_count() >= MAX_ACTIVE_GAMES):
+        RATE_LIMITED.inc(endpoint, 'active_games')
+        return {'error': 'Too many active games, please try again shortly'}, 5
+    limit = rate_limits.get(endpoint)
+    if limit:
+        allowed, retry_after = limiter.allow(f'{endpoint}:{client}', *limit)
+        if not allowed:
+            RATE_LIMITED.inc(endpoint, 'rate')
+            return {'error': 'Too many requests, please slow down'}, retry_after
+    return None
+
+ADMISSION_ENDPOINTS = {'new_game': 'new_game', 'make_guess': 'guess',
+                       'create_room': 'new_game', 'room_guess': 'guess'}
+# Endpoints that read or record history, leaderboards, stats or daily results
+STATE_ENDPOINTS = {'new_game', 'make_guess', 'leaderboard', 'leaderboard_events',
+                   'stats', 'daily_challenge'}
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.before_request
+def admit_request():
+    endpoint = ADMISSION_ENDPOINTS.get(request.endpoint)
+    if endpoint:
+        refused = admission_check(endpoint, request.remote_addr)
+        if refused:
+            payload, retry_after = refused
+            response = jsonify(payload)
+            response.status_code = 429
+            response.headers['Retry-After'] = str(math.ceil(retry_after))
+            return response
+
+@app.before_request
+def ensure_state():
+    # Only does anything after a LAZY_STARTUP; '/' never waits for the logs
+    if not state_loaded and request.endpoint in STATE_ENDPOINTS:
+        load_state()
+
+@app.after_request
+def record_request_metrics(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        endpoint = request.endpoint or 'unknown'
+        REQUEST_SECONDS.observe(time.perf_counter() - start, request.method, endpoint)
+        REQUESTS.inc(request.method, endpoint, str(response.status_code))
+    return response
 
 @app.route('/')
 def home():
-    return render_template('index.html')
+    return render_template('index.html', live_events=LIVE_EVENTS)
 
-@app.route('/new-game', methods=['POST'])
-def new_game():
-    # Clean up old games (older than 1 hour)
-    current_time = datetime.now()
-    old_games = [
-        gid for gid, game in games.items()
-        if (current_time - datetime.strptime(game['timestamp'], '%Y-%m-%d %H:%M')).total_seconds() > 3600
-    ]
-    for gid in old_games:
-        del games[gid]
-    
-    game_id = str(random.randint(10000, 99999))
-    game = {
-        'secret_code': generate_secret_code(),
-        'attempts': 0,
-        'max_attempts': 10,
-        'history': [],
-        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M'),
-        'start_time': datetime.now().timestamp()
-    }
+def new_game_state(data, session):
+    """Build the game a /new-game body asks for: ``{"variant": ...}`` (see
+    variants.py) or ``{"daily": true}`` for today's challenge.
+    Returns (game, None) or (None, (error payload, status))
+    """
+    if not isinstance(data, dict):
+        data = {}
+    now = datetime.now().timestamp()
+    if data.get('daily'):
+        if daily is None:
+            return None, (DAILY_DISABLED, 404)
+        day = day_of(now)
+        name = day_name(day)
+        player = session.get('nickname')
+        played = None, ({'error': "Today's challenge has already been played"}, 409)
+        if name in (session.get('daily_started'), session.get('daily_played')) or \
+                daily_board.played(player, day):
+            return played
+        # Marked as started right away, so abandoning the game and starting
+        # over cannot probe the same secret again
+        if player:
+            if not daily_board.start(player, day):
+                return played
+            daily_log.append({'day': day, 'date': name, 'player': player, 'started': True,
+                              'time': now})
+        session['daily_started'] = name
+        return GameState(daily.secret(day), now, daily=day), None
+    try:
+        variant = variant_from_spec(data.get('variant'))
+    except ValueError as e:
+        return None, ({'error': str(e)}, 400)
+    return GameState(variant.space.random_index(), now, variant=variant), None
+
+def create_game(replaces=None, game=None):
+    """Store a new game (a classic one by default), returns its id.
+    ``replaces``, the session's previous game, is deleted: a session plays
+    one game at a time, so abandoned games do not pile up until they expire.
+    """
+    if replaces:
+        games.delete(replaces)
+    # Clean up old games (older than 1 hour); only pops expired entries,
+    # the background sweeper handles the rest
+    GAMES_EXPIRED.inc(amount=games.expire(datetime.now().timestamp() - GAME_TTL))
     
-    games[game_id] = game
-    session['current_game'] = game_id
+    if game is None:
+        game = GameState(CLASSIC.space.random_index(), datetime.now().timestamp())
     
-    return jsonify({
+    game_id = new_game_id()
+    while not games.add(game_id, game):
+        game_id = new_game_id()
+    return game_id
+
+def create_game_token(game=None):
+    """Stateless mode: create a new game, returns (game_id, game_token)"""
+    game_id = new_game_id()
+    if game is None:
+        game = GameState(CLASSIC.space.random_index(), datetime.now().timestamp())
+    return game_id, tokens.dumps(game_id, game)
+
+def new_game_response(game_id, game):
+    response = {
         'game_id': game_id,
-        'last_games': game_history[:5],  # Always return only last 5 games
-        'hall_of_fame': hall_of_fame  # Add this line
-    })
+        'variant': game.variant.describe(),
+        'leaderboard_version': leaderboard_snapshot.version  # Fetch from /leaderboard when it changes
+    }
+    if game.daily:
+        response['daily'] = day_name(game.daily)
+    return response
 
-@app.route('/guess', methods=['POST'])
-def make_guess():
-    global game_history
+@app.route('/new-game', methods=['POST'])
+def new_game():
+    # Optional body: {"variant": "five"}, {"variant": {"length": 5, ...}}
+    # or {"daily": true}
+    game, error = new_game_state(request.get_json(silent=True), session)
+    if error:
+        return jsonify(error[0]), error[1]
     
-    data = request.get_json()
-    game_id = session.get('current_game')
-    guess = data['guess']
+    if games is None:
+        game_id, session['game_token'] = create_game_token(game)
+    else:
+        game_id = create_game(session.get('current_game'), game)
+    session['current_game'] = game_id
     
-    if not game_id or game_id not in games:
-        return jsonify({'error': 'No active game. Please start a new game.'}), 400
+    response = new_game_response(game_id, game)
+    if games is None:
+        response['game_token'] = session['game_token']
+    return jsonify(response)
+
+def play_guess(game, guess):
+    """Apply one guess to a stored game, inside GameStore.update.
+    Returns ((result, status, game_summary), keep_game)
+    """
+    if game is None:
+        return (dict(NO_GAME), 400, None), False
     
-    game = games[game_id]
+    if game.attempts >= game.max_attempts:
+        return ({'error': 'Game over'}, 400, None), True
     
-    if game['attempts'] >= game['max_attempts']:
-        return jsonify({'error': 'Game over'}), 400
+    space = game.variant.space
     
     # Validate guess
-    is_valid, error_message = validate_guess(guess)
+    with GUESS_PHASE_SECONDS.time('validate'):
+        is_valid, error_message = space.validate(guess)
     if not is_valid:
-        return jsonify({'error': error_message}), 400
+        return ({'error': error_message}, 400, None), True
     
-    game['attempts'] += 1
-    correct_pos, correct_digits = evaluate_guess(game['secret_code'], guess)
+    with GUESS_PHASE_SECONDS.time('evaluate'):
+        try:
+            guess_index = space.code_index(guess)
+        except ValueError:
+            return ({'error': 'Invalid guess'}, 400, None), True
+        correct_pos, correct_digits = space.score(game.secret, guess_index)
+        
+        # Store the guess as its code index and feedback byte; the guesses
+        # list and history are rebuilt from these when needed
+        game.record(guess_index, space.encode_feedback(correct_pos, correct_digits))
     
     # Create feedback
-    if correct_pos == 0 and correct_digits == 0:
-        feedback = "0"
-    else:
-        feedback = ""
-        if correct_pos > 0:
-            feedback += f"+{correct_pos} "
-        if correct_digits > 0:
-            feedback += f"-{correct_digits}"
+    feedback = format_feedback(correct_pos, correct_digits)
     
-    guess_result = {
+    game_over = game.game_over
+    result = {
         'guess': guess,
-        'feedback': feedback.strip()
+        'feedback': feedback,
+        'attempt': game.attempts,
+        'game_over': game_over,
+        'won': correct_pos == space.length,
+        'secret_code': space.code_string(game.secret) if game_over else None
     }
     
-    # Store the guess in game history
-    if 'guesses' not in game:
-        game['guesses'] = []
-    game['guesses'].append(guess_result)
+    if not game_over:
+        return (result, 200, None), True
     
-    result = {
-        'guess': guess,
-        'feedback': feedback.strip(),
-        'attempt': game['attempts'],
-        'game_over': correct_pos == 4 or game['attempts'] >= game['max_attempts'],
-        'won': correct_pos == 4,
-        'secret_code': ''.join(map(str, game['secret_code'])) if correct_pos == 4 or game['attempts'] >= game['max_attempts'] else None
-    }
+    end_time = datetime.now().timestamp()
+    elapsed_time = int(end_time - game.start_time)  # Time in seconds
     
-    game['history'].append(result)
+    game_summary = {
+        'attempts': game.attempts,
+        'won': result['won'],
+        'secret_code': space.code_string(game.secret),
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M'),
+        'guesses': game.guess_list(),
+        'elapsed_time': elapsed_time
+    }
+    if game.variant is not CLASSIC:
+        game_summary['variant'] = game.variant.key
+    if game.daily:
+        game_summary['daily'] = day_name(game.daily)
     
-    if result['game_over']:
-        end_time = datetime.now().timestamp()
-        elapsed_time = int(end_time - game['start_time'])  # Time in seconds
-        
-        game_summary = {
-            'attempts': game['attempts'],
-            'won': result['won'],
-            'secret_code': ''.join(map(str, game['secret_code'])),
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M'),
-            'guesses': game['guesses'],
-            'elapsed_time': elapsed_time
-        }
-        
-        # Add new game to history and keep only last 5
-        game_history.insert(0, game_summary)
+    # Completed games are removed from the store
+    return (result, 200, game_summary), False
+
+def play_token_guess(game_token, guess):
+    """Stateless /guess on the game inside a token.
+    Returns (result, status, game_summary); while the game goes on, the
+    result carries the next 'game_token'
+    """
+    loaded = tokens.loads(game_token) if game_token else None
+    if loaded is None:
+        return dict(NO_GAME), 400, None
+    game_id, game = loaded
+    attempt = game.attempts
+    (result, status, game_summary), keep = play_guess(game, guess)
+    # Each attempt of a game may be played once; resending an older token
+    # must not buy extra guesses
+    if game.attempts > attempt and not tokens.spend(game_id, attempt):
+        return {'error': 'Game token already used'}, 409, None
+    if keep and status == 200:
+        result['game_token'] = tokens.dumps(game_id, game)
+    return result, status, game_summary
+
+def record_daily_result(result, game_summary, player):
+    """Rank a finished daily challenge and show the solver's attempts"""
+    day = date.fromisoformat(game_summary['daily']).toordinal()
+    result['daily'] = game_summary['daily']
+    if daily is not None:
+        result['solver_attempts'] = daily.info(day)['solver_attempts']
+    # Results are ranked per nickname; anonymous players are not ranked
+    if player == 'Anonymous':
+        return
+    entry = {
+        'day': day,
+        'date': game_summary['daily'],
+        'player': player,
+        'won': game_summary['won'],
+        'attempts': game_summary['attempts'],
+        'elapsed_time': game_summary['elapsed_time'],
+        'time': datetime.now().timestamp()
+    }
+    if not daily_board.finished(player, day):
+        daily_log.append(entry)
+    daily_board.add(entry)
+
+def record_finished_game(result, game_summary, player):
+    """Add a finished game to history and the hall of fame"""
+    global game_history
+    if 'daily' in game_summary:
+        # Outside leaderboard_lock: the day's first result may run the solver
+        record_daily_result(result, game_summary, player)
+        with leaderboard_lock:
+            # Kept out of public history and /events: every daily game
+            # shares the day's secret
+            if analytics_log is not None:
+                analytics_log.append(game_summary, player)
+            stats_log.append(player_stats.record(player, game_summary, datetime.now().timestamp()))
+            result['leaderboard_version'] = publish_leaderboard()
+        return
+    with leaderboard_lock:
+        # Add new game to history and keep only last 5; a new list, so
+        # concurrent readers keep a consistent one
+        game_history = [game_summary] + game_history
         cleanup_history()  # This will keep only last 5 games
+        history_log.append(game_summary)
+        if analytics_log is not None:
+            analytics_log.append(game_summary, player)
+        if 'variant' not in game_summary:
+            stats_log.append(player_stats.record(player, game_summary, datetime.now().timestamp()))
         
-        # Clean up completed game from games dictionary
-        del games[game_id]
+        fame_entry, changes = update_hall_of_fame(game_summary, player)
         
-        result['last_games'] = game_history
+        version = publish_leaderboard()
+        result['leaderboard_version'] = version
         
-        if result['game_over'] and result['won']:
-            update_hall_of_fame(game_summary)
-            result['hall_of_fame'] = hall_of_fame
+        # Push small diffs to /events subscribers
+        events.publish('history', {'game': game_summary, 'keep': 5, 'version': version})
+        boards = [
+            {'window': window, 'position': change[0], 'reset': change[1]}
+            for window, change in changes.items() if window != 'player'
+        ]
+        if boards:
+            events.publish('hall_of_fame', {'entry': fame_entry, 'boards': boards,
+                                            'size': hall.boards['all'].size, 'version': version})
+
+@app.route('/guess', methods=['POST'])
+def make_guess():
+    data = request.get_json()
+    game_id = session.get('current_game')
+    guess = data['guess']
     
-    return jsonify(result)
+    if games is None:
+        # Token sent in the body, or kept in the session cookie
+        with GUESS_PHASE_SECONDS.time('store_update'):
+            result, status, game_summary = play_token_guess(
+                data.get('game_token') or session.get('game_token'), guess)
+        if 'game_token' in result:
+            session['game_token'] = result['game_token']
+        elif game_summary:
+            session.pop('game_token', None)
+    elif not game_id:
+        return jsonify(NO_GAME), 400
+    else:
+        # One read-modify-write of the stored game
+        with GUESS_PHASE_SECONDS.time('store_update'):
+            result, status, game_summary = games.update(game_id, lambda game: play_guess(game, guess))
+    if status != 200:
+        return jsonify(result), status
+    
+    if game_summary:
+        with GUESS_PHASE_SECONDS.time('record'):
+            record_finished_game(result, game_summary, session.get('nickname', 'Anonymous'))
+        if 'daily' in game_summary:
+            session['daily_played'] = game_summary['daily']
+    
+    with GUESS_PHASE_SECONDS.time('encode'):
+        return jsonify(result)
+
+def versioned_response(version, body):
+    """A JSON body tagged with its version as the ETag; 304 when the
+    client already has that version
+    """
+    etag = f'"{version}"'
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if etag in request.headers.get('If-None-Match', ''):
+        return Response(status=304, headers=headers)
+    return Response(body, mimetype='application/json', headers=headers)
+
+@app.route('/leaderboard')
+def leaderboard():
+    """Last games and hall of fame boards, with ETag revalidation"""
+    # Daily and weekly boards roll over even when nothing new happens
+    if window_bucket('daily', datetime.now().timestamp()) != snapshot_day:
+        publish_leaderboard()
+    
+    return versioned_response(*leaderboard_snapshot.current)
+
+@app.route('/events')
+def leaderboard_events():
+    """Server-Sent Events stream of history and hall of fame diffs"""
+    if not LIVE_EVENTS:
+        # 204 tells EventSource not to reconnect
+        return Response(status=204)
+    last_id = parse_last_event_id(request.headers.get('Last-Event-ID'))
+    return Response(events.subscribe(last_id), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/stats/<nickname>')
+def stats(nickname):
+    """Long-term statistics for a nickname, from running aggregates"""
+    player = player_stats.get(nickname)
+    if player is None:
+        return jsonify({'error': 'No games recorded for this nickname'}), 404
+    # Their hall of fame entry: fewest attempts, newest first
+    player['best_game'] = hall.player_best(nickname)
+    return jsonify(player)
+
+@app.route('/daily')
+def daily_challenge():
+    """Today's challenge: its board, and the solver's game once played"""
+    if daily is None:
+        return jsonify(DAILY_DISABLED), 404
+    today = day_of(datetime.now().timestamp())
+    info = daily.info(today)
+    response = {
+        'date': day_name(today),
+        'players': daily_board.players(today),
+        'leaderboard': daily_board.top(today),
+        'solver_attempts': info['solver_attempts']
+    }
+    # The solver's moves give the code away, so only after playing
+    if session.get('daily_played') == day_name(today):
+        response['solver_path'] = info['solver_path']
+    return jsonify(response)
+
+def join_room(room, session):
+    """Add the session to a room (once), returns its player id or None"""
+    joined = session.get('room')
+    if joined and joined[0] == room.room_id and joined[1] in room.racers:
+        return joined[1]
+    player_id = room.join(session.get('nickname'), datetime.now().timestamp())
+    if player_id:
+        # A session races in one room at a time
+        session['room'] = [room.room_id, player_id]
+    return player_id
+
+def room_response(room):
+    return versioned_response(*room.standings())
+
+@app.route('/rooms', methods=['POST'])
+def create_room():
+    """Open a race room and join it; optional body {"variant": ...}"""
+    data = request.get_json(silent=True)
+    try:
+        variant = variant_from_spec(data.get('variant') if isinstance(data, dict) else None)
+        room = rooms.create(datetime.now().timestamp(), variant)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if room is None:
+        return jsonify({'error': 'Too many open rooms, please try again shortly'}), 503
+    join_room(room, session)
+    return room_response(room)
+
+@app.route('/rooms/<room_id>/join', methods=['POST'])
+def room_join(room_id):
+    room = rooms.get(room_id)
+    if room is None:
+        return jsonify({'error': 'No such room'}), 404
+    if join_room(room, session) is None:
+        return jsonify({'error': 'The race is over' if room.race_over else 'Room is full'}), 409
+    return room_response(room)
+
+@app.route('/rooms/<room_id>/guess', methods=['POST'])
+def room_guess(room_id):
+    room = rooms.get(room_id)
+    if room is None:
+        return jsonify({'error': 'No such room'}), 404
+    joined = session.get('room')
+    player_id = joined[1] if joined and joined[0] == room_id else None
+    data = request.get_json(silent=True)
+    guess = data.get('guess') if isinstance(data, dict) else None
+    if not isinstance(guess, str):
+        return jsonify({'error': 'Invalid request'}), 400
+    result, status = room.guess(player_id, guess, datetime.now().timestamp())
+    return jsonify(result), status
+
+@app.route('/rooms/<room_id>')
+def room_standings(room_id):
+    """Full standings of a room, with ETag revalidation"""
+    room = rooms.get(room_id)
+    if room is None:
+        return jsonify({'error': 'No such room'}), 404
+    return room_response(room)
+
+@app.route('/rooms/<room_id>/events')
+def room_events(room_id):
+    """Server-Sent Events stream of a room's joins and guesses"""
+    room = rooms.get(room_id)
+    if room is None:
+        return jsonify({'error': 'No such room'}), 404
+    if not LIVE_EVENTS:
+        return Response(status=204)
+    last_id = parse_last_event_id(request.headers.get('Last-Event-ID'))
+    return Response(room.events.subscribe(last_id), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition of this worker's metrics"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/debug/profile')
+def debug_profile():
+    """Folded stacks from the sampling profiler, when PROFILE_INTERVAL is set"""
+    if sampling_profiler is None:
+        return jsonify({'error': 'Profiler not enabled (set PROFILE_INTERVAL)'}), 404
+    body = sampling_profiler.folded()
+    if request.args.get('reset'):
+        sampling_profiler.reset()
+    return Response(body, mimetype='text/plain')
+
+@app.route('/hint', methods=['GET', 'POST'])
+def hint():
+    """Suggest the next guess from the codes still consistent with the game"""
+    if games is None:
+        loaded = tokens.loads(request.values.get('game_token') or session.get('game_token', ''))
+        game = loaded[1] if loaded else None
+    else:
+        game_id = session.get('current_game')
+        game = games.get(game_id) if game_id else None
+    if game is None:
+        return jsonify(NO_GAME), 400
+    
+    if game.daily:
+        return jsonify({'error': 'Hints are not available in the daily challenge'}), 403
+    
+    strategy = request.args.get('strategy', 'minimax')
+    if strategy not in solver.STRATEGIES:
+        return jsonify({'error': f"Unknown strategy: {strategy}"}), 400
+    
+    guesses = game.guess_list()
+    space = game.variant.space
+    # The opening book only covers the classic code space
+    book_move = opening_book.lookup(guesses, strategy) if space is CLASSIC.space else None
+    guess, remaining = solver.hint(guesses, strategy, book_move, space)
+    return jsonify({
+        'guess': guess,
+        'remaining': remaining
+    })
 
 @app.route('/set-nickname', methods=['POST'])
 def set_nickname():
@@ -0,0 +1,337 @@
+"""ASGI entry point for the game API.
+
+/new-game, /guess and the /events streams (the leaderboard's and each race
+room's) are served by native async handlers that share
+app.py's game state, store and leaderboards. Blocking store calls (the
+SQLite backend) run in a worker thread, and persistence is already handed
+off to the background log writers, so the event loop never waits on disk.
+Every other route is forwarded to the Flask app through a small
+WSGI bridge, in a thread.
+
+Sessions use Flask's signed cookie, so both serving modes understand each
+other's cookies.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 10000
+
+Games (with the default GAME_STORE=memory) and race rooms live in one
+process, so more workers need GAME_STORE=sqlite and no rooms:
+
+    GAME_STORE=sqlite uvicorn asgi:app --host 0.0.0.0 --port 10000 --workers 4
+"""
+import asyncio
+import io
+import json
+import math
+import sys
+import time
+
+from werkzeug.http import dump_cookie, parse_cookie
+
+import app as flask_app
+from broadcast import parse_last_event_id
+from game_store import MemoryGameStore
+from ratelimit import SQLiteRateLimiter
+
+_serializer = flask_app.app.session_interface.get_signing_serializer(flask_app.app)
+_cookie_name = flask_app.app.config['SESSION_COOKIE_NAME']
+
+
+async def run_store(fn, *args):
+    """Call into the game store without blocking the event loop"""
+    if isinstance(flask_app.games, MemoryGameStore):
+        return fn(*args)
+    return await asyncio.to_thread(fn, *args)
+
+
+def load_session(scope):
+    for name, value in scope['headers']:
+        if name == b'cookie':
+            cookie = parse_cookie(value.decode('latin-1')).get(_cookie_name)
+            if cookie:
+                try:
+                    return _serializer.loads(cookie)
+                except Exception:
+                    return {}
+    return {}
+
+
+def session_header(session):
+    config = flask_app.app.config
+    cookie = dump_cookie(
+        _cookie_name, _serializer.dumps(session),
+        path=config['SESSION_COOKIE_PATH'] or '/',
+        domain=config['SESSION_COOKIE_DOMAIN'],
+        secure=config['SESSION_COOKIE_SECURE'],
+        httponly=config['SESSION_COOKIE_HTTPONLY'],
+        samesite=config['SESSION_COOKIE_SAMESITE'],
+    )
+    return (b'set-cookie', cookie.encode('latin-1'))
+
+
+def client_address(scope):
+    """Client IP, trusting one proxy hop like the Flask app's ProxyFix"""
+    for name, value in scope['headers']:
+        if name == b'x-forwarded-for':
+            return value.decode('latin-1').split(',')[-1].strip()
+    return (scope.get('client') or ('', 0))[0]
+
+
+async def read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+async def send_json(send, payload, status=200, headers=()):
+    body = json.dumps(payload).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            *headers,
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def new_game(scope, receive, send):
+    # Optional body with a variant or {"daily": true}, as in app.new_game
+    try:
+        data = json.loads(await read_body(receive) or b'{}')
+    except ValueError:
+        data = {}
+    if not await admitted('new_game', scope, send):
+        return
+    session = load_session(scope)
+    game, error = flask_app.new_game_state(data, session)
+    if error:
+        return await send_json(send, *error)
+    if flask_app.games is None:
+        game_id, session['game_token'] = flask_app.create_game_token(game)
+    else:
+        game_id = await run_store(flask_app.create_game, session.get('current_game'), game)
+    session['current_game'] = game_id
+    response = flask_app.new_game_response(game_id, game)
+    if flask_app.games is None:
+        response['game_token'] = session['game_token']
+    await send_json(send, response, headers=[session_header(session)])
+
+
+async def make_guess(scope, receive, send):
+    try:
+        data = json.loads(await read_body(receive))
+        guess = data['guess']
+    except (ValueError, KeyError, TypeError):
+        return await send_json(send, {'error': 'Invalid request'}, 400)
+    if not await admitted('guess', scope, send):
+        return
+    session = load_session(scope)
+    headers = []
+    phases = flask_app.GUESS_PHASE_SECONDS
+    if flask_app.games is None:
+        with phases.time('store_update'):
+            result, status, game_summary = flask_app.play_token_guess(
+                data.get('game_token') or session.get('game_token'), guess)
+        if 'game_token' in result:
+            session['game_token'] = result['game_token']
+            headers.append(session_header(session))
+        elif game_summary:
+            session.pop('game_token', None)
+            headers.append(session_header(session))
+    else:
+        game_id = session.get('current_game')
+        if not game_id:
+            return await send_json(send, flask_app.NO_GAME, 400)
+        with phases.time('store_update'):
+            result, status, game_summary = await run_store(
+                flask_app.games.update, game_id, lambda game: flask_app.play_guess(game, guess)
+            )
+    if status == 200 and game_summary:
+        player = session.get('nickname', 'Anonymous')
+        with phases.time('record'):
+            if 'daily' in game_summary:
+                # The day's first result may run the solver and lock the
+                # shared cache file: keep that off the event loop
+                await asyncio.to_thread(flask_app.record_finished_game, result, game_summary, player)
+            else:
+                flask_app.record_finished_game(result, game_summary, player)
+        if 'daily' in game_summary:
+            session['daily_played'] = game_summary['daily']
+            headers = [session_header(session)]
+    await send_json(send, result, status, headers)
+
+
+async def leaderboard_events(scope, receive, send):
+    """SSE stream; one coroutine per subscriber, no thread per connection"""
+    await stream_events(flask_app.events, scope, receive, send)
+
+
+async def room_events(scope, receive, send, room_id):
+    """A race room's SSE stream (see rooms.py)"""
+    room = flask_app.rooms.get(room_id)
+    if room is None:
+        return await send_json(send, {'error': 'No such room'}, 404)
+    await stream_events(room.events, scope, receive, send)
+
+
+async def stream_events(broadcaster, scope, receive, send):
+    last_id = None
+    for name, value in scope['headers']:
+        if name == b'last-event-id':
+            last_id = parse_last_event_id(value.decode('latin-1'))
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', b'text/event-stream'), (b'cache-control', b'no-cache')],
+    })
+
+    async def stream():
+        async for chunk in broadcaster.subscribe_async(last_id):
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        # The broadcaster was closed: end the response
+        await send({'type': 'http.response.body', 'body': b''})
+
+    streamer = asyncio.ensure_future(stream())
+    try:
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+    finally:
+        streamer.cancel()
+
+
+async def admitted(endpoint, scope, send):
+    """Apply app.admission_check; sends the 429 and returns False if refused"""
+    client = client_address(scope)
+    if isinstance(flask_app.limiter, SQLiteRateLimiter) or (
+            flask_app.games is not None and not isinstance(flask_app.games, MemoryGameStore)):
+        # SQLite buckets or game count: keep the queries off the event loop
+        refused = await asyncio.to_thread(flask_app.admission_check, endpoint, client)
+    else:
+        refused = flask_app.admission_check(endpoint, client)
+    if refused is None:
+        return True
+    payload, retry_after = refused
+    await send_json(send, payload, 429, [(b'retry-after', str(math.ceil(retry_after)).encode())])
+    return False
+
+
+async def timed(handler, scope, receive, send):
+    """Record the same request metrics as the Flask hooks for a native route"""
+    status = 500
+
+    async def send_and_record(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        await send(message)
+
+    start = time.perf_counter()
+    try:
+        await handler(scope, receive, send_and_record)
+    finally:
+        flask_app.REQUEST_SECONDS.observe(time.perf_counter() - start, scope['method'], handler.__name__)
+        flask_app.REQUESTS.inc(scope['method'], handler.__name__, str(status))
+
+
+ROUTES = {
+    ('POST', '/new-game'): new_game,
+    ('POST', '/guess'): make_guess,
+    ('GET', '/events'): leaderboard_events,
+}
+
+
+def wsgi_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        'CONTENT_LENGTH': str(len(body)),
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f'HTTP_{name}'
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def call_wsgi(environ):
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split()[0])
+        response['headers'] = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+
+    chunks = flask_app.app.wsgi_app(environ, start_response)
+    try:
+        body = b''.join(chunks)
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+    return response['status'], response['headers'], body
+
+
+async def forward_to_flask(scope, receive, send):
+    environ = wsgi_environ(scope, await read_body(receive))
+    status, headers, body = await asyncio.to_thread(call_wsgi, environ)
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await asyncio.to_thread(flask_app.history_log.flush)
+            await asyncio.to_thread(flask_app.fame_log.flush)
+            await asyncio.to_thread(flask_app.stats_log.flush)
+            await asyncio.to_thread(flask_app.daily_log.flush)
+            if flask_app.analytics_log is not None:
+                await asyncio.to_thread(flask_app.analytics_log.flush)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+    path = scope['path']
+    if scope['method'] == 'GET' and path.startswith('/rooms/') and path.endswith('/events'):
+        # Long-lived like /events, so not through the WSGI bridge either
+        return await room_events(scope, receive, send, path[len('/rooms/'):-len('/events')])
+    handler = ROUTES.get((scope['method'], path))
+    if handler is not None and not flask_app.state_loaded:
+        # LAZY_STARTUP: native routes skip the Flask hook that loads state
+        await asyncio.to_thread(flask_app.load_state)
+    if handler is None:
+        # Timed by the Flask request hooks
+        await forward_to_flask(scope, receive, send)
+    elif handler is leaderboard_events:
+        await handler(scope, receive, send)
+    else:
+        await timed(handler, scope, receive, send)
@@ -0,0 +1,118 @@
+"""Benchmark: columnar game export and aggregation.
+
+Times the writer packing finished games into .npy chunks, then builds a
+synthetic export of millions of classic games (written column by column,
+as the writer lays them out) and times the memory-mapped aggregation the
+analytics CLI runs, with and without a per-player filter.
+
+Run from the repo root:
+    python benchmarks/bench_analytics.py --games 2000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import ColumnarLog, aggregate
+from scoring import CODES, NUM_CODES, feedback_table, format_feedback, score
+
+
+def bench_writer(root, games, rng):
+    summaries = []
+    for _ in range(1000):
+        secret = rng.randrange(NUM_CODES)
+        guesses = [rng.randrange(NUM_CODES) for _ in range(rng.randint(3, 10))]
+        summaries.append({
+            'attempts': len(guesses),
+            'won': rng.random() < 0.8,
+            'secret_code': CODES[secret],
+            'guesses': [{'guess': CODES[g], 'feedback': format_feedback(*score(secret, g))}
+                        for g in guesses],
+            'elapsed_time': rng.randint(10, 600),
+        })
+    log = ColumnarLog(root, chunk_rows=65536)
+    start = time.perf_counter()
+    for i in range(games):
+        log.append(summaries[i % 1000], f'player{i % 50}')
+    queued = time.perf_counter() - start
+    log.flush()
+    total = time.perf_counter() - start
+    print(f"writer: {games:,} games, append {queued / games * 1e6:.2f} us/game on the "
+          f"request thread, {games / total:,.0f} games/s packed and written")
+
+
+def write_synthetic(root, games, days, chunk_rows, seed):
+    """Classic games straight into chunk files, vectorized"""
+    rng = np.random.default_rng(seed)
+    table = feedback_table()
+    players = np.array([f'player{i}' for i in range(1000)])
+    first_day = date.today() - timedelta(days=days - 1)
+    written = 0
+    part = 0
+    while written < games:
+        n = min(chunk_rows, games - written)
+        day = first_day + timedelta(days=written * days // games)
+        path = os.path.join(root, f'date={day.isoformat()}', f'part-{part:06d}')
+        os.makedirs(path)
+        attempts = rng.integers(3, 11, n).astype(np.uint8)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(attempts, out=offsets[1:])
+        secret = rng.integers(0, NUM_CODES, n).astype(np.uint32)
+        guesses = rng.integers(0, NUM_CODES, int(offsets[-1])).astype(np.uint32)
+        guesses[offsets[1:] - 1] = secret  # Last guess of each game wins
+        columns = {
+            'time': np.full(n, time.mktime(day.timetuple()) + 43200.0),
+            'won': np.ones(n, dtype=bool),
+            'daily': np.zeros(n, dtype=bool),
+            'attempts': attempts,
+            'elapsed_time': rng.integers(10, 900, n).astype(np.uint32),
+            'secret': secret,
+            'player': rng.integers(0, len(players), n).astype(np.int32),
+            'variant': np.zeros(n, dtype=np.int16),
+            'guess_offsets': offsets,
+            'guesses': guesses,
+            'feedback': table[np.repeat(secret, attempts), guesses],
+            'player_names': players,
+            'variant_names': np.array(['classic']),
+        }
+        for name, values in columns.items():
+            np.save(os.path.join(path, f'{name}.npy'), values)
+        written += n
+        part += 1
+    return part
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--games', type=int, default=2_000_000, help="Synthetic games to aggregate")
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--chunk-rows', type=int, default=65536)
+    parser.add_argument('--writer-games', type=int, default=50_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    bench_writer(tempfile.mkdtemp(), args.writer_games, random.Random(args.seed))
+
+    root = tempfile.mkdtemp()
+    start = time.perf_counter()
+    chunks = write_synthetic(root, args.games, args.days, args.chunk_rows, args.seed)
+    print(f"synthetic export: {args.games:,} games in {chunks} chunks "
+          f"({time.perf_counter() - start:.1f} s to write)")
+
+    for label, player in [('all games', None), ('one player', 'player7')]:
+        start = time.perf_counter()
+        stats = aggregate(root, player=player)
+        elapsed = time.perf_counter() - start
+        print(f"aggregate, {label}: {stats['games']:,} games in {elapsed:.2f} s "
+              f"({stats['games'] / elapsed:,.0f} games/s), mean attempts {stats['mean_attempts']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark: concurrency ceiling of gunicorn sync workers vs uvicorn + asgi.py.
+
+Both servers get the same number of worker processes (one per core by
+default). For each level, ``idle`` clients open a connection and send
+nothing, the way slow or idle browsers hold sockets, while a fixed set of
+active players run /new-game + /guess loops. A sync worker is tied up by
+an idle connection until its request timeout; the event loop is not.
+
+    python benchmarks/bench_asgi.py --idle 0 4 64 512 --seconds 5
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loadtest import Connection, percentile, start_server
+from scoring import CODES
+
+
+async def active_player(host, port, deadline, latencies, failures, timeout):
+    conn = Connection(host, port)
+    rng = random.Random()
+    cookie = None
+    while time.perf_counter() < deadline:
+        for path, body in [('/new-game', None)] + [('/guess', {'guess': rng.choice(CODES)})] * 5:
+            start = time.perf_counter()
+            try:
+                status, headers, _ = await asyncio.wait_for(
+                    conn.request('POST', path, body, cookie), timeout)
+            except Exception:
+                failures.append(path)
+                conn.close()
+                break
+            latencies.append(time.perf_counter() - start)
+            for header in headers.get('set-cookie', []):
+                cookie = header.split(';', 1)[0]
+    conn.close()
+
+
+async def measure(url, idle, active, seconds, timeout):
+    host, port = url.split('//')[1].split(':')
+    port = int(port)
+    idle_sockets = []
+    for _ in range(idle):
+        try:
+            idle_sockets.append(await asyncio.open_connection(host, port))
+        except OSError:
+            break
+    latencies, failures = [], []
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(
+        active_player(host, port, deadline, latencies, failures, timeout) for _ in range(active)
+    ))
+    for _, writer in idle_sockets:
+        writer.close()
+    latencies.sort()
+    return len(latencies) / seconds, percentile(latencies, 50), percentile(latencies, 99), len(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--idle', type=int, nargs='+', default=[0, 4, 64, 512])
+    parser.add_argument('--active', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--timeout', type=float, default=5, help="Per-request client timeout")
+    args = parser.parse_args()
+
+    print(f"{args.workers} worker process(es) each, {args.active} active players")
+    print(f"{'server':<18}{'idle conns':>11}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'timeouts':>10}")
+    for kind in ('gunicorn', 'uvicorn'):
+        # Sync gunicorn: one request per worker at a time, the Render setup
+        proc, url = start_server(kind, args.workers, threads=1)
+        try:
+            for idle in args.idle:
+                rate, p50, p99, failures = asyncio.run(
+                    measure(url, idle, args.active, args.seconds, args.timeout))
+                print(f"{kind:<18}{idle:>11}{rate:>10.1f}{p50:>10.2f}{p99:>10.2f}{failures:>10}")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark: daily challenge data, computed vs shared.
+
+Times the solver run behind a day's data (what one worker pays once per
+day), a second worker loading it from the shared cache file, and the
+in-memory hit every later request gets.
+
+Run from the repo root:
+    python benchmarks/bench_daily.py
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from daily import DailyChallenge, day_of
+from scoring import feedback_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--days', type=int, default=20, help="Days to compute")
+    parser.add_argument('--hits', type=int, default=100_000)
+    args = parser.parse_args()
+
+    feedback_table()  # Built once per process either way
+    cache_dir = tempfile.mkdtemp()
+    today = day_of(time.time())
+    days = range(today, today + args.days)
+
+    # Two workers sharing the cache directory, day after day (each new day
+    # prunes the older files)
+    computing = DailyChallenge('bench-key', cache_dir)
+    sharing = DailyChallenge('bench-key', cache_dir)
+    computed = loaded = 0.0
+    attempts = []
+    for day in days:
+        start = time.perf_counter()
+        attempts.append(computing.info(day)['solver_attempts'])
+        middle = time.perf_counter()
+        sharing.info(day)
+        computed += middle - start
+        loaded += time.perf_counter() - middle
+    computed /= args.days
+    loaded /= args.days
+
+    start = time.perf_counter()
+    for _ in range(args.hits):
+        sharing.info(days[-1])
+    hit = (time.perf_counter() - start) / args.hits
+
+    print(f"solver attempts over {args.days} days: {min(attempts)}-{max(attempts)}, "
+          f"mean {sum(attempts) / len(attempts):.2f}")
+    print(f"  computed (first worker):  {computed * 1e3:8.2f} ms/day")
+    print(f"  cache file (other workers): {loaded * 1e3:6.2f} ms/day  ({computed / loaded:.0f}x faster)")
+    print(f"  in memory (every request):  {hit * 1e6:6.2f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark: cost of /new-game expiry with many live games.
+
+Compares the original full scan (strptime on every live game) with the
+heap-backed MemoryGameStore.expire.
+
+    python benchmarks/bench_expiry.py
+"""
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_state import GameState
+from game_store import MemoryGameStore
+
+
+def full_scan(games, current_time):
+    """The expiry loop new_game used to run on every call"""
+    old_games = [
+        gid for gid, game in games.items()
+        if (current_time - datetime.strptime(game['timestamp'], '%Y-%m-%d %H:%M')).total_seconds() > 3600
+    ]
+    for gid in old_games:
+        del games[gid]
+
+
+def make_game(start_time):
+    return {
+        'timestamp': datetime.fromtimestamp(start_time).strftime('%Y-%m-%d %H:%M'),
+        'start_time': start_time,
+    }
+
+
+def main():
+    now = time.time()
+    for live in (1_000, 10_000, 50_000):
+        games = {str(i): make_game(now - i * 0.01) for i in range(live)}
+        start = time.perf_counter()
+        full_scan(games, datetime.now())
+        scan = time.perf_counter() - start
+
+        store = MemoryGameStore()
+        for i in range(live):
+            store.add(str(i), GameState(0, now - i * 0.01))
+        calls = 1_000
+        start = time.perf_counter()
+        for _ in range(calls):
+            store.expire(time.time() - 3600)
+        heap = (time.perf_counter() - start) / calls
+
+        print(f"{live:6d} live games: full scan {scan * 1000:8.2f} ms/new-game, "
+              f"heap {heap * 1e6:6.2f} us/new-game")
+
+
+if __name__ == '__main__':
+    main()
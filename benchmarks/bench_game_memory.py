@@ -0,0 +1,106 @@
+"""Benchmark: memory per active game, old dict layout vs GameState.
+
+Fills a dict of game ids with 100k games that are a few guesses in, once
+as the dicts /guess used to keep (secret list, 'guesses' and 'history'
+lists of dicts) and once as GameState objects, and reports traced bytes
+per game. Also compares the size of a stored SQLite row.
+
+    python benchmarks/bench_game_memory.py --games 100000 --guesses 5
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_rules import generate_secret_code
+from game_state import GameState
+from game_store import new_game_id
+from scoring import CODES, code_index, encode_feedback, format_feedback, score
+
+
+def legacy_game(secret, guesses, start_time):
+    """A game dict as /new-game and /guess used to build it"""
+    game = {
+        'secret_code': secret,
+        'attempts': 0,
+        'max_attempts': 10,
+        'history': [],
+        'timestamp': datetime.fromtimestamp(start_time).strftime('%Y-%m-%d %H:%M'),
+        'start_time': start_time,
+        'guesses': [],
+    }
+    secret_index = code_index(secret)
+    for guess in guesses:
+        game['attempts'] += 1
+        # Fresh strings per guess, as decoded from each request
+        guess = ''.join(list(guess))
+        feedback = format_feedback(*score(secret_index, code_index(guess)))
+        game['guesses'].append({'guess': guess, 'feedback': feedback})
+        game['history'].append({
+            'guess': guess,
+            'feedback': feedback,
+            'attempt': game['attempts'],
+            'game_over': False,
+            'won': False,
+            'secret_code': None
+        })
+    return game
+
+
+def compact_game(secret, guesses, start_time):
+    game = GameState(code_index(secret), start_time)
+    for guess in guesses:
+        guess_index = code_index(guess)
+        game.record(guess_index, encode_feedback(*score(game.secret, guess_index)))
+    return game
+
+
+def measure(build, games, guesses, seed):
+    rng = random.Random(seed)
+    random.seed(seed)
+    inputs = [(generate_secret_code(), rng.sample(CODES, guesses)) for _ in range(games)]
+    ids = [new_game_id() for _ in range(games)]
+    now = time.time()
+    games_by_id = {}
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for game_id, (secret, picks) in zip(ids, inputs):
+        games_by_id[game_id] = build(secret, picks, now)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / games, games_by_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=100_000)
+    parser.add_argument('--guesses', type=int, default=5, help="Guesses made in each game")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    legacy, legacy_games = measure(legacy_game, args.games, args.guesses, args.seed)
+    del legacy_games
+    compact, compact_games = measure(compact_game, args.games, args.guesses, args.seed)
+    print(f"{args.games} active games, {args.guesses} guesses each "
+          f"(game objects plus the id -> game dict)")
+    print(f"  dict games:      {legacy:8.0f} bytes/game")
+    print(f"  GameState:       {compact:8.0f} bytes/game  ({legacy / compact:.1f}x smaller)")
+
+    secret = generate_secret_code()
+    picks = random.Random(args.seed).sample(CODES, args.guesses)
+    row_json = len(json.dumps(legacy_game(secret, picks, time.time())))
+    row_packed = len(compact_game(secret, picks, time.time()).to_bytes())
+    print(f"  SQLite row:      {row_json} bytes JSON -> {row_packed} bytes packed")
+
+
+if __name__ == '__main__':
+    main()
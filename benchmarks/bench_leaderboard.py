@@ -0,0 +1,67 @@
+"""Benchmark: cost per win of the hall of fame update.
+
+Compares the original update (append, re-sort with strptime in the key,
+truncate) with leaderboard.HallOfFame, which maintains all-time, daily and
+weekly boards plus per-player bests.
+
+    python benchmarks/bench_leaderboard.py
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leaderboard import HallOfFame
+
+
+def legacy_update(hall_of_fame, entry):
+    """The update_hall_of_fame sort this structure replaced"""
+    hall_of_fame.append(entry)
+    hall_of_fame.sort(key=lambda x: (x['attempts'], -datetime.strptime(x['timestamp'], '%Y-%m-%d %H:%M').timestamp()))
+    return hall_of_fame[:10]
+
+
+def make_wins(n, players=1000):
+    rng = random.Random(0)
+    start = datetime(2025, 1, 1).timestamp()
+    wins = []
+    for i in range(n):
+        t = start + i * 30  # a win every 30 seconds
+        wins.append({
+            'attempts': rng.randint(3, 10),
+            'secret_code': '1234',
+            'timestamp': datetime.fromtimestamp(t).strftime('%Y-%m-%d %H:%M'),
+            'player': f'player{rng.randrange(players)}',
+            'time': t,
+        })
+    return wins
+
+
+def main():
+    for n in (1_000, 10_000, 100_000):
+        wins = make_wins(n)
+
+        board = []
+        start = time.perf_counter()
+        for entry in wins:
+            board = legacy_update(board, entry)
+        legacy = (time.perf_counter() - start) / n
+
+        hall = HallOfFame(size=10)
+        start = time.perf_counter()
+        for entry in wins:
+            hall.add(entry)
+        incremental = (time.perf_counter() - start) / n
+
+        # Same all-time ranking as the original sort (minute resolution aside)
+        assert [e['attempts'] for e in hall.top('all')] == [e['attempts'] for e in board]
+
+        print(f"{n:7d} wins: legacy {legacy * 1e6:6.2f} us/win, "
+              f"HallOfFame (3 boards + player bests) {incremental * 1e6:6.2f} us/win")
+
+
+if __name__ == '__main__':
+    main()
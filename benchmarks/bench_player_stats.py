@@ -0,0 +1,52 @@
+"""Benchmark: player statistics at millions of recorded games.
+
+Records games for many players through PlayerStats, then times /stats
+reads and the size of the compacted log (one line per player).
+
+    python benchmarks/bench_player_stats.py --games 1000000 --players 10000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from player_stats import PlayerStats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-player statistics")
+    parser.add_argument('--games', type=int, default=1_000_000)
+    parser.add_argument('--players', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    players = [f'player{i}' for i in range(args.players)]
+    summaries = [{'won': rng.random() < 0.7, 'attempts': rng.randint(1, 10),
+                  'elapsed_time': int(rng.expovariate(1 / 90))} for _ in range(4096)]
+    stats = PlayerStats()
+
+    start = time.perf_counter()
+    for i in range(args.games):
+        stats.record(players[rng.randrange(args.players)], summaries[i & 4095], i)
+    elapsed = time.perf_counter() - start
+    print(f"record: {args.games:,} games in {elapsed:.2f}s ({elapsed / args.games * 1e6:.2f} us/game)")
+
+    reads = 100_000
+    start = time.perf_counter()
+    for i in range(reads):
+        stats.get(players[i % args.players])
+    elapsed = time.perf_counter() - start
+    print(f"read:   {elapsed / reads * 1e6:.2f} us per /stats lookup")
+
+    compacted = sum(len(json.dumps(record)) + 1 for record in stats.load([]))
+    print(f"log after compaction: {len(stats)} lines, {compacted / 1e6:.1f} MB "
+          f"({compacted / len(stats):.0f} bytes/player)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Benchmark: race rooms at thousands of rooms with dozens of players each.
+
+Opens the rooms and fills them, timing room creation and joins and the
+memory a room and a racer cost. Then it times guesses spread over every
+room, each scored from the room's shared feedback row and published to
+the room's event stream. Finally it subscribes async listeners (as the
+ASGI /rooms/<id>/events streams do) to a share of the rooms and times the
+fan-out of every guess to every listener.
+
+Run from the repo root:
+    python benchmarks/bench_rooms.py --rooms 2000 --players 40
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rooms import Rooms
+from scoring import CODES, feedback_table
+
+
+def bench_join(rooms, count, players):
+    start = time.perf_counter()
+    opened = [rooms.create(time.time()) for _ in range(count)]
+    created = time.perf_counter() - start
+    start = time.perf_counter()
+    racers = [[room.join(f'player{i}', time.time()) for i in range(players)] for room in opened]
+    joined = time.perf_counter() - start
+    print(f"create: {created / count * 1e6:.1f} us/room, "
+          f"join: {joined / (count * players) * 1e6:.2f} us/player")
+    return opened, racers
+
+
+def bench_guess(opened, racers, guesses, rng):
+    # Distinct valid codes, not the secret: every racer keeps playing
+    plays = []
+    for _ in range(guesses):
+        i = rng.randrange(len(opened))
+        plays.append((opened[i], rng.choice(racers[i]), CODES[rng.randrange(len(CODES))]))
+    start = time.perf_counter()
+    for room, player_id, guess in plays:
+        room.guess(player_id, guess, time.time())
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    for room in opened:
+        room.standings()
+    standings = (time.perf_counter() - start) / len(opened)
+    print(f"guess: {elapsed / guesses * 1e6:.2f} us/guess (score, update, publish), "
+          f"{guesses / elapsed:,.0f} guesses/s; standings rebuild {standings * 1e6:.1f} us/room")
+
+
+async def bench_broadcast(opened, racers, listeners, rounds, rng):
+    """Every racer guesses ``rounds`` times, one guess per room per step;
+    each step waits until every listener has its room's event
+    """
+    received = 0
+    expected = 0
+    step_done = asyncio.Event()
+
+    async def listen(room):
+        nonlocal received
+        async for chunk in room.events.subscribe_async(room.events.last_id):
+            if chunk.startswith(b'id:'):
+                received += 1
+                if received == expected:
+                    step_done.set()
+
+    tasks = [asyncio.ensure_future(listen(room)) for room in opened for _ in range(listeners)]
+    await asyncio.sleep(0.1)  # Let every listener subscribe
+    secrets = [CODES[room.secret] for room in opened]
+    published = 0.0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for player in range(len(racers[0])):
+            step_done.clear()
+            expected += len(opened) * listeners
+            publish_start = time.perf_counter()
+            for room, players, secret in zip(opened, racers, secrets):
+                guess = CODES[rng.randrange(len(CODES))]
+                # Never the secret, so no racer finishes early
+                room.guess(players[player], guess if guess != secret else CODES[0], time.time())
+            published += time.perf_counter() - publish_start
+            await step_done.wait()
+    elapsed = time.perf_counter() - start
+    for task in tasks:
+        task.cancel()
+    events = expected // listeners
+    print(f"broadcast: {len(opened)} rooms x {listeners} listeners, {events:,} events -> "
+          f"{expected:,} deliveries in {elapsed:.2f} s ({elapsed / expected * 1e6:.2f} us/delivery, "
+          f"{(elapsed - published) / (events // len(opened)) * 1e3:.2f} ms to reach every listener "
+          f"of every room after each step)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rooms', type=int, default=2000)
+    parser.add_argument('--players', type=int, default=40)
+    parser.add_argument('--guesses', type=int, default=200_000)
+    parser.add_argument('--listen-rooms', type=int, default=200,
+                        help="Rooms with /events listeners")
+    parser.add_argument('--rounds', type=int, default=2, help="Guesses per racer while listened to")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    feedback_table()  # Shared by every classic room
+    rng = random.Random(args.seed)
+    opened, racers = bench_join(Rooms(max_rooms=0, max_players=args.players),
+                                args.rooms, args.players)
+    bench_guess(opened, racers, args.guesses, rng)
+
+    sample = min(args.rooms, 200)
+    tracemalloc.start()
+    kept = Rooms(max_rooms=0, max_players=args.players)
+    for _ in range(sample):
+        room = kept.create(time.time())
+        for i in range(args.players):
+            room.join(f'player{i}', time.time())
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"memory: {memory / sample / 1024:.1f} KiB/room with {args.players} players, "
+          f"{memory / (sample * args.players):.0f} bytes/player all in "
+          f"(the classic feedback row is a view of the shared table)")
+    del kept
+
+    # Fresh rooms: racers that finished above would refuse guesses
+    opened, racers = bench_join(Rooms(max_rooms=0, max_players=args.players),
+                                args.listen_rooms, args.players)
+    asyncio.run(bench_broadcast(opened, racers, args.players, args.rounds, rng))
+
+
+if __name__ == '__main__':
+    main()
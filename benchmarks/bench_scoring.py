@@ -0,0 +1,82 @@
+"""Microbenchmark: table-backed evaluate_guess vs the original list implementation.
+
+Run from the repo root:
+    python benchmarks/bench_scoring.py
+"""
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_rules import evaluate_guess
+from scoring import CODES, code_index, feedback_table, score
+
+
+def legacy_evaluate_guess(secret_code, guess):
+    """The evaluate_guess implementation this engine replaced"""
+    correct_position = 0
+    correct_digit = 0
+    guess = [int(d) for d in guess]
+    for i in range(4):
+        if guess[i] == secret_code[i]:
+            correct_position += 1
+    guess_copy = guess.copy()
+    secret_copy = secret_code.copy()
+    for i in range(3, -1, -1):
+        if guess_copy[i] == secret_copy[i]:
+            guess_copy.pop(i)
+            secret_copy.pop(i)
+    for digit in guess_copy:
+        if digit in secret_copy:
+            correct_digit += 1
+            secret_copy.remove(digit)
+    return correct_position, correct_digit
+
+
+def timeit(label, fn, pairs):
+    start = time.perf_counter()
+    for secret, guess in pairs:
+        fn(secret, guess)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed / len(pairs) * 1e9:8.0f} ns/call")
+    return elapsed
+
+
+def main(n=200_000):
+    rng = random.Random(42)
+
+    start = time.perf_counter()
+    feedback_table()
+    print(f"table build: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Sanity check: the table agrees with the original implementation
+    for _ in range(20_000):
+        secret, guess = rng.choice(CODES), rng.choice(CODES)
+        assert evaluate_guess([int(d) for d in secret], guess) == \
+            legacy_evaluate_guess([int(d) for d in secret], guess)
+
+    pairs = [([int(d) for d in rng.choice(CODES)], rng.choice(CODES)) for _ in range(n)]
+    index_pairs = [(code_index(s), code_index(g)) for s, g in pairs]
+
+    legacy = timeit("legacy evaluate_guess", legacy_evaluate_guess, pairs)
+    current = timeit("game_rules.evaluate_guess", evaluate_guess, pairs)
+    indexed = timeit("scoring.score (indices)", score, index_pairs)
+
+    table = feedback_table()
+    secrets = np.array([i for i, _ in index_pairs])
+    guesses = np.array([j for _, j in index_pairs])
+    start = time.perf_counter()
+    table[secrets, guesses]
+    vectorized = time.perf_counter() - start
+    print(f"{'vectorized table lookup':<32} {vectorized / n * 1e9:8.1f} ns/call")
+
+    print(f"speedup: {legacy / current:.1f}x (strings), {legacy / indexed:.1f}x (indices), "
+          f"{legacy / vectorized:.0f}x (vectorized)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""Benchmark: cold start, eager vs LAZY_STARTUP.
+
+Every measurement is a fresh interpreter, as on a serverless cold start:
+the time from launching the process to the response of its first request,
+for `/` and for `/new-game`, and the latency of the first /guess (which
+loads the feedback table: mapped from feedback_table.npy, or built when the
+file is missing). The logs start out as a long-running server would leave
+them: compacted, plus the games appended since.
+
+Run from the repo root:
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from player_stats import PlayerStats
+from scoring import CODES, format_feedback, score
+
+# Runs in the child: `launched` is the parent's time.time() at spawn
+CHILD = '''
+import json, sys, time
+launched, first, build_table = float(sys.argv[1]), sys.argv[2], sys.argv[3] == '1'
+sys.path.insert(0, {root!r})
+if build_table:
+    import scoring
+    scoring.load_feedback_table = lambda: None
+import app
+imported = time.time() - launched
+client = app.app.test_client()
+if first == '/':
+    client.get('/')
+else:
+    client.post('/new-game')
+responded = time.time() - launched
+guess = None
+if first == '/guess':
+    start = time.perf_counter()
+    client.post('/guess', json={{'guess': '1234'}})
+    guess = time.perf_counter() - start
+print(json.dumps({{'import': imported, 'response': responded, 'guess': guess}}))
+'''
+
+
+def seed_logs(path, games, players, rng):
+    """History, hall of fame and stats logs as a previous run left them"""
+    stats = PlayerStats()
+    with open(os.path.join(path, 'game_history.jsonl'), 'w') as history, \
+            open(os.path.join(path, 'hall_of_fame.jsonl'), 'w') as fame, \
+            open(os.path.join(path, 'player_stats.jsonl'), 'w') as stats_log:
+        for i in range(games):
+            secret = rng.randrange(len(CODES))
+            guesses = [rng.randrange(len(CODES)) for _ in range(rng.randint(3, 9))] + [secret]
+            player = f'player{rng.randrange(players)}'
+            summary = {
+                'attempts': len(guesses),
+                'won': True,
+                'secret_code': CODES[secret],
+                'timestamp': '2024-01-01 12:00',
+                'guesses': [{'guess': CODES[g], 'feedback': format_feedback(*score(secret, g))}
+                            for g in guesses],
+                'elapsed_time': rng.randint(10, 600),
+            }
+            history.write(json.dumps(summary) + '\n')
+            stats_log.write(json.dumps(stats.record(player, summary, time.time())) + '\n')
+            if len(guesses) <= 5:
+                fame.write(json.dumps({'attempts': len(guesses), 'secret_code': CODES[secret],
+                                       'timestamp': summary['timestamp'], 'player': player,
+                                       'time': time.time() - rng.randrange(30 * 86400)}) + '\n')
+
+
+def cold_start(template, lazy, first, build_table):
+    # A fresh copy per run: an eager start compacts the logs it reads
+    workdir = tempfile.mkdtemp()
+    try:
+        for name in os.listdir(template):
+            shutil.copy(os.path.join(template, name), workdir)
+        env = dict(os.environ, LAZY_STARTUP='1' if lazy else '0', ANALYTICS_DIR='off')
+        env.pop('VERCEL', None)
+        out = subprocess.run(
+            [sys.executable, '-c', CHILD.format(root=ROOT), repr(time.time()), first,
+             '1' if build_table else '0'],
+            cwd=workdir, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        return json.loads(out.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(workdir)
+
+
+def median(runs, key):
+    return statistics.median(run[key] for run in runs) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--runs', type=int, default=5, help="Cold starts per measurement")
+    parser.add_argument('--games', type=int, default=20_000,
+                        help="Games appended to the logs since their last compaction")
+    parser.add_argument('--players', type=int, default=2_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    template = tempfile.mkdtemp()
+    seed_logs(template, args.games, args.players, random.Random(args.seed))
+    size = sum(os.path.getsize(os.path.join(template, name)) for name in os.listdir(template))
+    print(f"logs: {args.games:,} games, {args.players:,} players, {size / 1e6:.1f} MB; "
+          f"median of {args.runs} cold starts, ms from process launch")
+    print(f"{'mode':<8}{'import':>9}{'first /':>10}{'first /new-game':>17}"
+          f"{'first /guess (mapped)':>23}{'(built)':>10}")
+    for lazy in (False, True):
+        home = [cold_start(template, lazy, '/', False) for _ in range(args.runs)]
+        new_game = [cold_start(template, lazy, '/new-game', False) for _ in range(args.runs)]
+        mapped = [cold_start(template, lazy, '/guess', False) for _ in range(args.runs)]
+        built = [cold_start(template, lazy, '/guess', True) for _ in range(args.runs)]
+        print(f"{'lazy' if lazy else 'eager':<8}{median(home + new_game, 'import'):>9.0f}"
+              f"{median(home, 'response'):>10.0f}{median(new_game, 'response'):>17.0f}"
+              f"{median(mapped, 'guess'):>23.1f}{median(built, 'guess'):>10.1f}")
+    shutil.rmtree(template)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark: the variant scoring engine as the code space grows.
+
+For each code space reports the one-off cost of packing every code into
+its digit and count words (and of the full table, where it gets one), a
+single score() call against the reference score_codes, one feedback row
+over every code, and a /hint-style suggestion after one guess.
+
+Run from the repo root:
+    python benchmarks/bench_variants.py
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import solver
+from scoring import format_feedback, score_codes
+from variants import CodeSpace
+
+SPACES = [
+    # (label, length, colors, repeats, leading_zero)
+    ('classic 4/10', 4, 10, False, False),
+    ('repeats 4/10', 4, 10, True, True),
+    ('five 5/10', 5, 10, False, False),
+    ('7/10 no repeats', 7, 10, False, True),
+    ('six 6/10', 6, 10, True, True),
+]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def bench_space(label, length, colors, repeats, leading_zero, rng, scores):
+    # A fresh CodeSpace, not code_space(), so build times are not cached
+    space = CodeSpace(length, colors, repeats, leading_zero)
+    space.classic = False  # Time the generic path on the classic rules too
+    _, build = timed(space.code_words)
+    word_bytes = sum(words.nbytes for words in space.code_words())
+    table, table_build = timed(space.table)
+
+    pairs = [(space.random_index(rng), space.random_index(rng)) for _ in range(scores)]
+    digits = [(space.digits_of(s), space.code_string(g)) for s, g in pairs]
+    _, engine = timed(lambda: [space.score(s, g) for s, g in pairs])
+    _, reference = timed(lambda: [score_codes(s, g) for s, g in digits])
+
+    everything = solver.all_candidates(space)
+    _, row = timed(space.feedback_matrix, [pairs[0][1]], everything)
+
+    secret, first = pairs[0]
+    guesses = [{'guess': space.code_string(first),
+                'feedback': format_feedback(*space.score(secret, first))}]
+    (_, remaining), hint = timed(solver.hint, guesses, 'minimax', None, space)
+
+    table_note = f"{table_build * 1e3:8.0f} ms" if table is not None else '       none'
+    print(f"{label:<17}{space.size:>10,}{build * 1e3:>9.1f} ms{word_bytes / 2**20:>8.1f} MiB"
+          f"{table_note}{engine / scores * 1e6:>8.1f} us{reference / scores * 1e6:>8.1f} us"
+          f"{row * 1e3:>9.1f} ms{hint * 1e3:>9.0f} ms{remaining:>10,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--scores', type=int, default=20_000, help="score() calls per space")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'space':<17}{'codes':>10}{'words':>12}{'memory':>12}{'table':>11}"
+          f"{'score':>11}{'reference':>11}{'row':>12}{'hint':>12}{'remaining':>10}")
+    for label, length, colors, repeats, leading_zero in SPACES:
+        bench_space(label, length, colors, repeats, leading_zero, rng, args.scores)
+
+
+if __name__ == '__main__':
+    main()
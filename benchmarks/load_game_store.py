@@ -0,0 +1,79 @@
+"""Load test: /new-game + /guess throughput against a shared SQLiteGameStore.
+
+Each worker process imports the app with GAME_STORE=sqlite pointed at the
+same database file and plays games through Flask's test client, the way
+several gunicorn workers would share one store.
+
+    python benchmarks/load_game_store.py --workers 1 2 4 --seconds 5
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def worker(db_path, workdir, seconds, counter):
+    os.environ['GAME_STORE'] = 'sqlite'
+    os.environ['GAME_STORE_PATH'] = db_path
+    os.environ.update(RATE_LIMIT_NEW_GAME='off', RATE_LIMIT_GUESS='off')
+    os.chdir(workdir)
+    from app import app
+    from scoring import CODES
+
+    client = app.test_client()
+    requests = 0
+    deadline = time.perf_counter() + seconds
+    i = os.getpid()
+    while time.perf_counter() < deadline:
+        client.post('/new-game')
+        requests += 1
+        for _ in range(10):
+            i += 7919
+            data = client.post('/guess', json={'guess': CODES[i % len(CODES)]}).get_json()
+            requests += 1
+            if data.get('game_over'):
+                break
+    with counter.get_lock():
+        counter.value += requests
+
+
+def run(workers, seconds):
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, 'games.db')
+        # Create the schema once before the workers race for it
+        from game_store import SQLiteGameStore
+        SQLiteGameStore(db_path)
+
+        counter = multiprocessing.Value('q', 0)
+        procs = [
+            multiprocessing.Process(target=worker, args=(db_path, workdir, seconds, counter))
+            for _ in range(workers)
+        ]
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join()
+        return counter.value / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{multiprocessing.cpu_count()} CPUs available")
+    baseline = None
+    for workers in args.workers:
+        rate = run(workers, args.seconds)
+        baseline = baseline or rate
+        print(f"{workers:3d} workers: {rate:8.0f} req/s  ({rate / baseline:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""Benchmark suite for the game logic and HTTP hot paths.
+
+Times the game rules (evaluate_guess, validate_guess, generate_secret_code),
+update_hall_of_fame, history persistence (JsonlLog append + flush) and full
+/new-game and /guess round-trips through Flask's test client. Each
+benchmark runs several rounds; the median time per operation is reported
+and written as JSON.
+
+With --baseline, results are compared against a stored run and the script
+exits with status 1 if any benchmark's median is slower than the baseline
+by more than --threshold (a fraction, default 0.25). Each run also times
+a fixed pure-Python calibration loop, and comparisons are scaled by it so
+a uniformly slower or busier machine does not read as a regression (pass
+--no-normalize to compare raw times). Baselines still depend on the
+machine: regenerate one on the machine that runs the comparison.
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --threshold 0.3
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from game_rules import evaluate_guess, generate_secret_code, validate_guess
+from persistence import JsonlLog
+from scoring import CODES
+
+BENCHMARKS = {}
+
+
+def benchmark(ops):
+    """Register ``setup(rng) -> run(ops)`` as a benchmark of ``ops``
+    operations per round
+    """
+    def register(setup):
+        BENCHMARKS[setup.__name__] = (setup, ops)
+        return setup
+    return register
+
+
+def _load_app():
+    # app.py writes its logs to the working directory
+    os.chdir(tempfile.mkdtemp())
+    os.environ.update(RATE_LIMIT_NEW_GAME='off', RATE_LIMIT_GUESS='off')
+    import app
+    return app
+
+
+@benchmark(ops=100_000)
+def evaluate_guess_strings(rng):
+    pairs = [([int(d) for d in rng.choice(CODES)], rng.choice(CODES)) for _ in range(4096)]
+
+    def run(ops):
+        for i in range(ops):
+            secret, guess = pairs[i & 4095]
+            evaluate_guess(secret, guess)
+    return run
+
+
+@benchmark(ops=100_000)
+def validate_guess_mixed(rng):
+    guesses = [rng.choice(CODES) for _ in range(3072)] + \
+        [rng.choice(['0123', '1123', '12a4', '12345', '']) for _ in range(1024)]
+    rng.shuffle(guesses)
+
+    def run(ops):
+        for i in range(ops):
+            validate_guess(guesses[i & 4095])
+    return run
+
+
+@benchmark(ops=50_000)
+def generate_secret(rng):
+    def run(ops):
+        for _ in range(ops):
+            generate_secret_code()
+    return run
+
+
+@benchmark(ops=20_000)
+def hall_of_fame_update(rng):
+    app = _load_app()
+    summaries = [{
+        'attempts': rng.randint(3, 10),
+        'won': True,
+        'secret_code': rng.choice(CODES),
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M'),
+    } for _ in range(4096)]
+    players = [f'player{i}' for i in range(100)]
+
+    def run(ops):
+        for i in range(ops):
+            app.update_hall_of_fame(summaries[i & 4095], players[i % 100])
+    return run
+
+
+@benchmark(ops=5_000)
+def history_append_flush(rng):
+    log = JsonlLog(os.path.join(tempfile.mkdtemp(), 'history.jsonl'), flush_interval=0.01)
+    summary = {
+        'attempts': 6, 'won': True, 'secret_code': '1234',
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M'),
+        'guesses': [{'guess': rng.choice(CODES), 'feedback': '+1 -2'} for _ in range(6)],
+        'elapsed_time': 42,
+    }
+
+    def run(ops):
+        for _ in range(ops):
+            log.append(summary)
+        log.flush()
+    return run
+
+
+@benchmark(ops=500)
+def http_new_game(rng):
+    client = _load_app().app.test_client()
+
+    def run(ops):
+        for _ in range(ops):
+            client.post('/new-game')
+    return run
+
+
+@benchmark(ops=2_000)
+def http_guess_roundtrip(rng):
+    client = _load_app().app.test_client()
+    guesses = [rng.choice(CODES) for _ in range(4096)]
+
+    def run(ops):
+        client.post('/new-game')
+        for i in range(ops):
+            data = client.post('/guess', json={'guess': guesses[i & 4095]}).get_json()
+            if data.get('game_over'):
+                client.post('/new-game')
+    return run
+
+
+def calibrate(rounds):
+    """Median seconds for a fixed interpreter-bound workload"""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        table = {}
+        for i in range(200_000):
+            table[i & 1023] = table.get(i & 1023, 0) + str(i).count('1')
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def run_benchmarks(names, rounds, scale, seed):
+    results = {}
+    for name in names:
+        setup, ops = BENCHMARKS[name]
+        ops = max(1, int(ops * scale))
+        run = setup(random.Random(seed))
+        run(max(1, ops // 10))  # Warm up
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            run(ops)
+            timings.append((time.perf_counter() - start) / ops)
+        median = statistics.median(timings)
+        results[name] = {
+            'ops_per_round': ops,
+            'rounds': rounds,
+            'median_us': median * 1e6,
+            'min_us': min(timings) * 1e6,
+            'stdev_us': statistics.stdev(timings) * 1e6 if rounds > 1 else 0.0,
+            'ops_per_sec': 1 / median,
+        }
+        print(f"{name:<26}{median * 1e6:>12.2f} us/op{1 / median:>14,.0f} ops/s")
+    return results
+
+
+def compare(report, baseline, threshold, normalize=True):
+    """Print the change against a baseline; returns the regressed names"""
+    speed = 1.0
+    if normalize and baseline.get('calibration_s'):
+        speed = report['calibration_s'] / baseline['calibration_s']
+        print(f"\nMachine speed vs baseline: calibration loop {speed:.2f}x the baseline time")
+    regressions = []
+    print(f"\n{'benchmark':<26}{'baseline us':>14}{'current us':>14}{'change':>10}")
+    for name, result in report['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            print(f"{name:<26}{'-':>14}{result['median_us']:>14.2f}{'new':>10}")
+            continue
+        change = result['median_us'] / (base['median_us'] * speed) - 1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<26}{base['median_us']:>14.2f}{result['median_us']:>14.2f}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Mastermind benchmark suite")
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help="Benchmarks to run")
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiply ops per round")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write results as JSON")
+    parser.add_argument('--baseline', help="Compare against a stored results file")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="Allowed slowdown against the baseline, as a fraction")
+    parser.add_argument('--save-baseline', metavar='PATH', help="Store these results as the baseline")
+    parser.add_argument('--no-normalize', action='store_true',
+                        help="Compare raw times, without the calibration loop")
+    args = parser.parse_args()
+
+    calibration = calibrate(args.rounds)
+    results = run_benchmarks(args.only or list(BENCHMARKS), args.rounds, args.scale, args.seed)
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'calibration_s': calibration,
+        'results': results,
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(os.path.join(ROOT, path) if not os.path.isabs(path) else path, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+
+    if args.baseline:
+        path = args.baseline if os.path.isabs(args.baseline) else os.path.join(ROOT, args.baseline)
+        with open(path) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold, not args.no_normalize)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\nNo regressions over {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
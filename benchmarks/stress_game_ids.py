@@ -0,0 +1,62 @@
+"""Stress test: allocate game ids at high rate and check for collisions.
+
+Allocates ids into a MemoryGameStore (which refuses taken ids) and then
+creates games through /new-game with Flask's test client.
+
+    python benchmarks/stress_game_ids.py --games 500000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_state import GameState
+from game_store import MemoryGameStore, new_game_id
+
+
+def stress_store(n):
+    store = MemoryGameStore()
+    start_time = time.time()
+    collisions = 0
+    start = time.perf_counter()
+    for _ in range(n):
+        if not store.add(new_game_id(), GameState(0, start_time)):
+            collisions += 1
+    elapsed = time.perf_counter() - start
+    print(f"store: {n} ids in {elapsed:.2f}s ({n / elapsed:,.0f}/s), "
+          f"{collisions} collisions, {len(store)} live games")
+    return collisions == 0 and len(store) == n
+
+
+def stress_app(n):
+    os.chdir(tempfile.mkdtemp())
+    os.environ.update(RATE_LIMIT_NEW_GAME='off', MAX_ACTIVE_GAMES='0')
+    from app import app, games
+    # No cookies: every game gets its own session, so none replaces another
+    client = app.test_client(use_cookies=False)
+    ids = set()
+    start = time.perf_counter()
+    for _ in range(n):
+        ids.add(client.post('/new-game').get_json()['game_id'])
+    elapsed = time.perf_counter() - start
+    print(f"/new-game: {n} games in {elapsed:.2f}s ({n / elapsed:,.0f}/s), "
+          f"{n - len(ids)} duplicate ids, {len(games)} live games")
+    return len(ids) == n and len(games) == n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=500_000)
+    parser.add_argument('--http-games', type=int, default=20_000)
+    args = parser.parse_args()
+
+    ok = stress_store(args.games) and stress_app(args.http_games)
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
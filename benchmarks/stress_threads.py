@@ -0,0 +1,98 @@
+"""Stress test: many threads hammer one game, then check its invariants.
+
+Each thread uses its own Flask test client carrying the same session
+cookie, so every /guess targets the same game, while other threads create
+and finish their own games to churn the shared history and hall of fame.
+
+    python benchmarks/stress_threads.py --threads 32 --rounds 50
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--rounds', type=int, default=50, help="Shared games to hammer")
+    parser.add_argument('--store', choices=['memory', 'sqlite'], default='memory')
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    os.environ['GAME_STORE'] = args.store
+    os.environ.update(RATE_LIMIT_NEW_GAME='off', RATE_LIMIT_GUESS='off')
+    import app as game_app
+    from scoring import CODES
+
+    failures = []
+    for round_number in range(args.rounds):
+        owner = game_app.app.test_client()
+        owner.post('/new-game')
+        cookie = owner.get_cookie('session').value
+        game = game_app.games.get(_session_game(game_app, cookie))
+        secret = CODES[game.secret]
+        # One guess per thread: only max_attempts may be accepted, the
+        # winning guess (included once) must end the game exactly once
+        guesses = [c for c in CODES if c != secret][:args.threads - 1] + [secret]
+        responses = []
+        barrier = threading.Barrier(args.threads * 2)
+
+        def hammer(guess):
+            client = game_app.app.test_client()
+            client.set_cookie('session', cookie)
+            barrier.wait()
+            response = client.post('/guess', json={'guess': guess})
+            responses.append((response.status_code, response.get_json()))
+
+        def churn():
+            client = game_app.app.test_client()
+            barrier.wait()
+            client.post('/new-game')
+            for code in CODES[:10]:
+                data = client.post('/guess', json={'guess': code}).get_json()
+                if data.get('game_over'):
+                    break
+
+        threads = [threading.Thread(target=hammer, args=(g,)) for g in guesses]
+        threads += [threading.Thread(target=churn) for _ in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        accepted = [data for status, data in responses if status == 200]
+        statuses = Counter(status for status, _ in responses)
+        attempts = sorted(data['attempt'] for data in accepted)
+        over = [data for data in accepted if data['game_over']]
+        if statuses[500]:
+            failures.append(f"round {round_number}: {statuses[500]} server errors")
+        if len(accepted) > 10:
+            failures.append(f"round {round_number}: {len(accepted)} guesses accepted, max is 10")
+        if attempts != list(range(1, len(accepted) + 1)):
+            failures.append(f"round {round_number}: attempt numbers {attempts}")
+        if len(over) != 1:
+            failures.append(f"round {round_number}: game ended {len(over)} times")
+        if len(game_app.game_history) > 5 or len(game_app.hall_of_fame) > 10:
+            failures.append(f"round {round_number}: history/hall of fame overflow")
+
+    print(f"{args.rounds} rounds x {args.threads} hammering + {args.threads} churning threads "
+          f"({args.store} store)")
+    for failure in failures:
+        print("FAIL", failure)
+    print("OK" if not failures else f"{len(failures)} failures")
+    sys.exit(1 if failures else 0)
+
+
+def _session_game(game_app, cookie):
+    """Decode the signed session cookie to find the game id"""
+    serializer = game_app.app.session_interface.get_signing_serializer(game_app.app)
+    return serializer.loads(cookie)['current_game']
+
+
+if __name__ == '__main__':
+    main()
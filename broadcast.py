@@ -0,0 +1,125 @@
+"""Server-Sent Events fan-out for leaderboard updates.
+
+Each event is serialized exactly once into a shared ring buffer of
+``(id, bytes)``; every subscriber, sync generator or asyncio task, just
+yields the same bytes objects. A subscriber that reconnects with
+Last-Event-ID resumes from the buffer, or gets a ``resync`` event telling
+it to refetch /leaderboard if it fell further behind than the buffer holds.
+"""
+import json
+import threading
+from collections import deque
+
+KEEPALIVE = b': keepalive\n\n'
+
+
+class Broadcaster:
+    def __init__(self, size=256):
+        self._events = deque(maxlen=size)
+        self._last_id = 0
+        self._cond = threading.Condition()
+        self._async_waiters = {}  # event loop -> set of asyncio.Event
+        self.closed = False
+
+    @property
+    def last_id(self):
+        return self._last_id
+
+    def publish(self, event, data):
+        """Serialize an event once and wake every subscriber"""
+        with self._cond:
+            self._last_id += 1
+            payload = f"id: {self._last_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+            self._events.append((self._last_id, payload.encode()))
+            self._cond.notify_all()
+            waiters = [(loop, list(wakeups)) for loop, wakeups in self._async_waiters.items()]
+        # One thread-safe call (a write to the loop's self-pipe) per event
+        # loop, not per subscriber
+        for loop, wakeups in waiters:
+            loop.call_soon_threadsafe(_set_all, wakeups)
+        return self._last_id
+
+    def close(self):
+        """Publish a final 'closed' event; subscribers end once they have it"""
+        self.closed = True
+        self.publish('closed', {})
+
+    def since(self, last_id):
+        """Return (events after last_id, new last id)"""
+        with self._cond:
+            events = self._events
+            if not events or last_id >= events[-1][0]:
+                return [], last_id
+            if last_id < events[0][0] - 1:
+                # Missed events that already left the buffer
+                resync = f"id: {events[-1][0]}\nevent: resync\ndata: {{}}\n\n".encode()
+                return [resync], events[-1][0]
+            # Ids are consecutive: take the newest ones from the right end,
+            # without scanning the buffer
+            newest = events[-1][0]
+            return [events[last_id - newest + i][1] for i in range(newest - last_id)], newest
+
+    def subscribe(self, last_id=None, keepalive=15):
+        """Blocking generator of SSE bytes, for WSGI streaming responses"""
+        last_id = self._last_id if last_id is None else last_id
+        yield b"retry: 3000\n\n"
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._last_id > last_id or self.closed,
+                                    timeout=keepalive)
+            payloads, last_id = self.since(last_id)
+            if not payloads:
+                if self.closed:
+                    return
+                yield KEEPALIVE
+            yield from payloads
+
+    async def subscribe_async(self, last_id=None, keepalive=15):
+        """Async generator of SSE bytes, for the ASGI app"""
+        # Imported here: asyncio costs ~20 ms of every WSGI cold start
+        import asyncio
+        last_id = self._last_id if last_id is None else last_id
+        loop = asyncio.get_running_loop()
+        wakeup = asyncio.Event()
+        with self._cond:
+            self._async_waiters.setdefault(loop, set()).add(wakeup)
+        # One keepalive timer, re-armed only when it fires: a timer (or an
+        # asyncio.wait_for task) per wait costs more than the event itself
+        due = loop.time() + keepalive
+        timer = loop.call_later(keepalive, wakeup.set)
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                if self._last_id <= last_id:
+                    if self.closed:
+                        return
+                    await wakeup.wait()
+                wakeup.clear()
+                payloads, last_id = self.since(last_id)
+                if loop.time() >= due:
+                    due = loop.time() + keepalive
+                    timer = loop.call_later(keepalive, wakeup.set)
+                    if not payloads:
+                        yield KEEPALIVE
+                for payload in payloads:
+                    yield payload
+        finally:
+            timer.cancel()
+            with self._cond:
+                wakeups = self._async_waiters.get(loop)
+                if wakeups is not None:
+                    wakeups.discard(wakeup)
+                    if not wakeups:
+                        del self._async_waiters[loop]
+
+
+def _set_all(wakeups):
+    for wakeup in wakeups:
+        wakeup.set()
+
+
+def parse_last_event_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,45 @@
+"""Locking helpers for threaded workers (gunicorn --threads).
+
+Writers to one game serialize on that game's stripe of a ``StripedLock``,
+so different games never contend on a single global lock. Shared lists
+(history, leaderboards) are copy-on-write: writers build a new object under
+a lock and swap the reference, so readers never lock and never see a
+half-updated list. ``SQLiteConnections`` gives each thread of each worker
+its own connection to a database the workers share.
+"""
+import os
+import sqlite3
+import threading
+import zlib
+
+
+class StripedLock:
+    """A fixed set of locks; a key always maps to the same stripe"""
+
+    def __init__(self, stripes=64):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def for_key(self, key):
+        # crc32 rather than hash(): stable, and spreads similar ids evenly
+        return self._locks[zlib.crc32(str(key).encode()) % len(self._locks)]
+
+
+class SQLiteConnections:
+    """One autocommit connection per thread and per process (connections
+    must not cross a fork) to a WAL-mode SQLite database
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self.get().execute('PRAGMA journal_mode=WAL')
+
+    def get(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
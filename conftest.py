@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """app.py imported once, writing its logs to a temporary directory"""
+    os.chdir(tmp_path_factory.mktemp('app'))
+    os.environ.update(DAILY_SEED='test-seed', ANALYTICS_DIR='off', LAZY_STARTUP='0',
+                      RATE_LIMIT_NEW_GAME='off', RATE_LIMIT_GUESS='off')
+    import app
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
@@ -0,0 +1,208 @@
+"""Daily challenge: one classic secret per day, the same for everyone.
+
+The day's secret comes from a generator seeded with a keyed hash of the
+date, so every worker (and every restart) derives the same code without
+sharing any state, and the key keeps it unguessable from the date alone.
+
+What the server knows about a day's code is computed once per day: the
+solver's game against it (how many attempts the solver needs) and, for
+each of the solver's moves, how many candidates every possible feedback
+would have left. ``DailyChallenge.info`` keeps it in memory and in a JSON
+file per day under ``cache_dir``; the first worker to need it computes it
+under a file lock, the others read the file.
+
+``DailyBoard`` ranks the day's wins by attempts, then elapsed time. Each
+player is ranked on their first finished game of the day only.
+"""
+import hashlib
+import itertools
+import json
+import os
+import random
+import threading
+from datetime import date, datetime
+
+import opening_book
+import solver
+from leaderboard import Leaderboard
+from persistence import FileLock
+from scoring import CODES, WINNING_FEEDBACK, decode_feedback, encode_feedback, format_feedback, score
+from variants import CLASSIC
+
+
+def day_of(time):
+    """The challenge day (local date ordinal) a timestamp falls in"""
+    return datetime.fromtimestamp(time).date().toordinal()
+
+
+def day_name(day):
+    return date.fromordinal(day).isoformat()
+
+
+class DailyChallenge:
+    def __init__(self, key, cache_dir='daily_cache'):
+        if isinstance(key, str):
+            key = key.encode()
+        self._key = hashlib.blake2b(key, digest_size=32, person=b'daily-challenge').digest()
+        self.cache_dir = cache_dir
+        self._info = {}  # day -> info, today's and yesterday's at most
+        self._lock = threading.Lock()
+
+    def secret(self, day):
+        """Code index of the day's secret"""
+        seed = hashlib.blake2b(day_name(day).encode(), key=self._key, digest_size=16).digest()
+        return CLASSIC.space.random_index(random.Random(seed))
+
+    def info(self, day):
+        """The day's precomputed solver data, computed at most once per day
+        across every worker sharing ``cache_dir``
+        """
+        info = self._info.get(day)
+        if info is not None:
+            return info
+        with self._lock:
+            if day not in self._info:
+                self._info = {d: i for d, i in self._info.items() if d >= day - 1}
+                self._info[day] = self._load_or_compute(day)
+            return self._info[day]
+
+    def _load_or_compute(self, day):
+        path = os.path.join(self.cache_dir, f'{day_name(day)}.json')
+        info = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with FileLock(path):
+                try:
+                    with open(path, 'r') as f:
+                        return json.load(f)
+                except (OSError, ValueError):
+                    pass
+                info = self._compute(day)
+                tmp_path = path + '.tmp'
+                with open(tmp_path, 'w') as f:
+                    json.dump(info, f)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            # No writable cache (a read-only serverless filesystem): every
+            # process computes the day once, in memory
+            print(f"Daily cache unavailable, computing in memory: {e}")
+            return info if info is not None else self._compute(day)
+        self._prune(day)
+        return info
+
+    def _compute(self, day):
+        info = solve(self.secret(day))
+        info['date'] = day_name(day)
+        return info
+
+    def _prune(self, day):
+        # One file per day: drop the ones older than yesterday
+        keep = {day_name(d) for d in (day - 1, day)}
+        for name in os.listdir(self.cache_dir):
+            if name.partition('.')[0] not in keep:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+
+def solve(secret, strategy='minimax'):
+    """Play the solver (opening book, then search) against a secret.
+    Returns {'solver_attempts': n, 'solver_path': [move, ...]} where each
+    move has the guess, its feedback, the candidates before it and
+    'partition': {feedback: candidates left} for every possible feedback.
+    """
+    candidates = solver.all_candidates()
+    guesses = []
+    path = []
+    while True:
+        move = opening_book.lookup(guesses, strategy)
+        guess = CLASSIC.space.code_index(move) if move else solver.suggest_guess(candidates, strategy)
+        counts = solver.partition_counts([guess], candidates)[0]
+        feedback_code = encode_feedback(*score(secret, guess))
+        feedback = format_feedback(*decode_feedback(feedback_code))
+        path.append({
+            'guess': CODES[guess],
+            'feedback': feedback,
+            'candidates': len(candidates),
+            'partition': {format_feedback(*decode_feedback(code)): int(count)
+                          for code, count in enumerate(counts) if count},
+        })
+        if feedback_code == WINNING_FEEDBACK:
+            return {'solver_attempts': len(path), 'solver_path': path}
+        guesses.append({'guess': CODES[guess], 'feedback': feedback})
+        candidates = solver.filter_candidates(candidates, guess, feedback_code)
+
+
+class DailyBoard:
+    """Top-K wins of the current day, plus who has started and finished it"""
+
+    def __init__(self, size=10):
+        self.day = None
+        self._board = Leaderboard(size)
+        self._started = set()
+        self._players = set()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def _roll(self, day):
+        """Switch to ``day``; False for a record of an earlier day"""
+        if self.day is not None and day < self.day:
+            return False
+        if day != self.day:
+            self.day = day
+            self._board.clear()
+            self._started.clear()
+            self._players.clear()
+        return True
+
+    def start(self, player, day):
+        """Mark the day as started by a player. Returns False if they
+        already started it: one daily game per player, even unfinished
+        """
+        with self._lock:
+            if not self._roll(day) or player in self._started or player in self._players:
+                return False
+            self._started.add(player)
+            return True
+
+    def add(self, entry):
+        """Record a finished daily game ({'day', 'player', 'won', 'attempts',
+        'elapsed_time', ...}). Returns the board position, or None if it did
+        not make the board, is not the player's first game of the day or
+        is for an earlier day.
+        """
+        with self._lock:
+            if not self._roll(entry['day']):
+                return None
+            if entry['player'] in self._players:
+                return None
+            self._players.add(entry['player'])
+            if not entry['won']:
+                return None
+            key = (entry['attempts'], entry['elapsed_time'], next(self._sequence))
+            return self._board.add(key, entry)
+
+    def played(self, player, day):
+        """Whether a player started (or finished) the day's challenge"""
+        return day == self.day and (player in self._started or player in self._players)
+
+    def finished(self, player, day):
+        return day == self.day and player in self._players
+
+    def top(self, day):
+        return self._board.entries() if day == self.day else []
+
+    def players(self, day):
+        return len(self._players) if day == self.day else 0
+
+    def load(self, records):
+        """Replay logged starts and results; returns the ones still needed
+        (the current day's)
+        """
+        for record in records:
+            if record.get('started'):
+                self.start(record['player'], record['day'])
+            else:
+                self.add(record)
+        return [record for record in records if record['day'] == self.day]
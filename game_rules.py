@@ -0,0 +1,35 @@
+"""Rules of the web game: secret generation, guess validation and scoring.
+
+Thin wrappers over the classic CodeSpace (see variants.py), kept free of
+Flask and of app.py's startup side effects so the simulation engine and
+tools can import them directly.
+"""
+from variants import CLASSIC
+
+SPACE = CLASSIC.space
+# Bound once: evaluate_guess is the simulation's inner loop
+_code_index, _index, _score = SPACE.code_index, SPACE.index, SPACE.score
+
+
+def generate_secret_code():
+    """Generate a 4-digit code where:
+    1. No digit repeats
+    2. First digit cannot be 0
+    """
+    return SPACE.digits_of(SPACE.random_index())
+
+def validate_guess(guess):
+    """Validate that the guess follows the rules:
+    1. Must be 4 digits
+    2. No repeating digits
+    3. Cannot start with 0
+    Returns: (bool, str) - (is_valid, error_message)
+    """
+    return SPACE.validate(guess)
+
+def evaluate_guess(secret_code, guess):
+    """Return (correct_position, correct_digit) for codes given as strings
+    or lists of digits
+    """
+    return _score(_code_index(secret_code) if type(secret_code) is str else _index(secret_code),
+                  _code_index(guess) if type(guess) is str else _index(guess))
@@ -0,0 +1,86 @@
+"""Compact representation of an active game.
+
+A game used to be a dict holding the secret as a list, plus each guess
+twice (in 'guesses' and 'history') as strings with a formatted feedback
+string. ``GameState`` keeps only what is needed to rebuild all of that:
+the secret's code index, one code index per guess in an ``array`` and
+one feedback byte per guess, plus the game's variant and, for a daily
+challenge, its day. Response dicts are
+built on demand, and ``to_bytes`` gives the SQLite store a few dozen bytes
+per game instead of a JSON document.
+"""
+import struct
+from array import array
+
+from scoring import format_feedback
+from variants import CLASSIC, variant_from_key
+
+# secret, attempts, max_attempts, start_time, daily, variant key length
+_HEADER = struct.Struct('<IBBdIB')
+
+
+def _index_array(variant):
+    # 2 bytes per guess while every index fits, as for the classic game
+    return array('H' if variant.space.size <= 0x10000 else 'I')
+
+
+class GameState:
+    __slots__ = ('secret', 'max_attempts', 'start_time', 'guesses', 'feedback', 'variant',
+                 'daily')
+
+    def __init__(self, secret, start_time, max_attempts=None, guesses=None, feedback=None,
+                 variant=CLASSIC, daily=0):
+        self.secret = secret
+        self.variant = variant
+        self.daily = daily  # Day ordinal of a daily challenge game, 0 otherwise
+        self.max_attempts = max_attempts if max_attempts is not None else variant.max_attempts
+        self.start_time = start_time
+        self.guesses = guesses if guesses is not None else _index_array(variant)
+        self.feedback = feedback if feedback is not None else bytearray()
+
+    @property
+    def attempts(self):
+        return len(self.guesses)
+
+    @property
+    def won(self):
+        return bool(self.feedback) and self.feedback[-1] == self.variant.space.winning_feedback
+
+    @property
+    def game_over(self):
+        return self.won or self.attempts >= self.max_attempts
+
+    @property
+    def secret_code(self):
+        """The secret as a list of digits, as generate_secret_code returns it"""
+        return self.variant.space.digits_of(self.secret)
+
+    def record(self, guess_index, feedback_code):
+        self.guesses.append(guess_index)
+        self.feedback.append(feedback_code)
+
+    def guess_list(self):
+        """[{'guess': '1234', 'feedback': '+1 -2'}, ...] as the API returns it"""
+        space = self.variant.space
+        return [
+            {'guess': space.code_string(guess),
+             'feedback': format_feedback(*space.decode_feedback(feedback))}
+            for guess, feedback in zip(self.guesses, self.feedback)
+        ]
+
+    def to_bytes(self):
+        key = self.variant.key.encode()
+        return (_HEADER.pack(self.secret, self.attempts, self.max_attempts, self.start_time,
+                             self.daily, len(key))
+                + key + self.guesses.tobytes() + bytes(self.feedback))
+
+    @classmethod
+    def from_bytes(cls, data):
+        secret, attempts, max_attempts, start_time, daily, key_length = _HEADER.unpack_from(data)
+        offset = _HEADER.size + key_length
+        variant = variant_from_key(bytes(data[_HEADER.size:offset]).decode())
+        guesses = _index_array(variant)
+        end = offset + guesses.itemsize * attempts
+        guesses.frombytes(data[offset:end])
+        feedback = bytearray(data[end:end + attempts])
+        return cls(secret, start_time, max_attempts, guesses, feedback, variant, daily)
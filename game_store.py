@@ -0,0 +1,231 @@
+"""Storage backends for active games.
+
+``MemoryGameStore`` keeps games in a process-local dict (the original
+behaviour). ``SQLiteGameStore`` keeps them in a WAL-mode SQLite file that
+several gunicorn workers can share, so a game started on one worker can be
+continued on any other.
+
+Pick the backend with the GAME_STORE environment variable ('memory' or
+'sqlite'); GAME_STORE_PATH sets the SQLite file (default games.db).
+GAME_STORE=token keeps no store at all; games travel in signed tokens
+(see game_token.py).
+"""
+import heapq
+import os
+import secrets
+import threading
+import time
+
+from concurrency import SQLiteConnections, StripedLock
+from game_state import GameState
+
+
+class GameStore:
+    """Interface shared by the game store backends.
+
+    Games are ``GameState`` objects (see game_state.py) keyed by game id.
+    """
+
+    def get(self, game_id):
+        """Return the game, or None. Use update() to change it"""
+        raise NotImplementedError
+
+    def add(self, game_id, game):
+        """Insert a new game. Returns False, leaving the store unchanged,
+        if ``game_id`` is already taken.
+        """
+        raise NotImplementedError
+
+    def update(self, game_id, fn):
+        """Atomically read-modify-write one game.
+
+        ``fn(game)`` receives the stored game (None if missing), may mutate
+        it, and returns ``(result, keep)``. The game is written back when
+        ``keep`` is true and deleted otherwise. Returns ``result``.
+        """
+        raise NotImplementedError
+
+    def delete(self, game_id):
+        raise NotImplementedError
+
+    def expire(self, cutoff):
+        """Delete games whose start_time is older than ``cutoff``.
+        Returns the number of games removed.
+        """
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def __contains__(self, game_id):
+        return self.get(game_id) is not None
+
+    def start_sweeper(self, ttl, interval=60, on_expire=None):
+        """Expire games older than ``ttl`` seconds from a daemon thread
+        every ``interval`` seconds, so no request has to pay for it.
+        ``on_expire(count)`` is called with the number removed each time.
+        """
+        def sweep():
+            while True:
+                time.sleep(interval)
+                try:
+                    removed = self.expire(time.time() - ttl)
+                    if on_expire:
+                        on_expire(removed)
+                except Exception as e:
+                    print(f"Error expiring games: {e}")
+
+        thread = threading.Thread(target=sweep, name='game-sweeper', daemon=True)
+        thread.start()
+        return thread
+
+
+class MemoryGameStore(GameStore):
+    """Process-local store; only valid with a single worker process.
+
+    Expiry uses a min-heap of (start_time, game_id), so each game is pushed
+    and popped once: amortized O(1) per game instead of a scan of every
+    live game. Finished games leave stale heap entries that are skipped
+    when they surface, or dropped by a rebuild once they outnumber the
+    live games.
+
+    Writes to a game hold that game's lock stripe, so threads working on
+    different games do not contend; reads take no lock. The heap has its
+    own lock, never held together with a stripe.
+    """
+
+    def __init__(self, stripes=64):
+        self._games = {}
+        self._expiry = []
+        self._expiry_lock = threading.Lock()
+        self._locks = StripedLock(stripes)
+
+    def get(self, game_id):
+        return self._games.get(game_id)
+
+    def add(self, game_id, game):
+        with self._locks.for_key(game_id):
+            if game_id in self._games:
+                return False
+            self._games[game_id] = game
+        with self._expiry_lock:
+            heapq.heappush(self._expiry, (game.start_time, game_id))
+            if len(self._expiry) > 2 * len(self._games) + 1024:
+                self._expiry = [(g.start_time, gid) for gid, g in list(self._games.items())]
+                heapq.heapify(self._expiry)
+        return True
+
+    def update(self, game_id, fn):
+        with self._locks.for_key(game_id):
+            game = self._games.get(game_id)
+            result, keep = fn(game)
+            if game is not None and not keep:
+                self._games.pop(game_id, None)
+            return result
+
+    def delete(self, game_id):
+        with self._locks.for_key(game_id):
+            self._games.pop(game_id, None)
+
+    def expire(self, cutoff):
+        with self._expiry_lock:
+            expired = []
+            while self._expiry and self._expiry[0][0] < cutoff:
+                expired.append(heapq.heappop(self._expiry))
+        removed = 0
+        for start_time, game_id in expired:
+            with self._locks.for_key(game_id):
+                game = self._games.get(game_id)
+                # Skip entries for games that finished or whose id was reused
+                if game is not None and game.start_time == start_time:
+                    del self._games[game_id]
+                    removed += 1
+        return removed
+
+    def __len__(self):
+        return len(self._games)
+
+
+class SQLiteGameStore(GameStore):
+    """SQLite store in WAL mode, shared by every process using the same file.
+
+    Each game is one row keyed by its id, holding ``GameState.to_bytes()``,
+    so a guess is a single indexed read-modify-write of a few dozen bytes
+    inside a ``BEGIN IMMEDIATE`` transaction.
+    """
+
+    def __init__(self, path='games.db'):
+        self.path = path
+        self._connections = SQLiteConnections(path)
+        conn = self._connections.get()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS game_states ('
+            ' id TEXT PRIMARY KEY,'
+            ' state BLOB NOT NULL,'
+            ' start_time REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS game_states_start_time ON game_states (start_time)')
+
+    def get(self, game_id):
+        row = self._connections.get().execute(
+            'SELECT state FROM game_states WHERE id = ?', (game_id,)
+        ).fetchone()
+        return GameState.from_bytes(row[0]) if row else None
+
+    def add(self, game_id, game):
+        return self._connections.get().execute(
+            'INSERT OR IGNORE INTO game_states (id, state, start_time) VALUES (?, ?, ?)',
+            (game_id, game.to_bytes(), game.start_time)
+        ).rowcount == 1
+
+    def update(self, game_id, fn):
+        conn = self._connections.get()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT state FROM game_states WHERE id = ?', (game_id,)).fetchone()
+            game = GameState.from_bytes(row[0]) if row else None
+            result, keep = fn(game)
+            if game is not None:
+                if keep:
+                    conn.execute('UPDATE game_states SET state = ? WHERE id = ?',
+                                 (game.to_bytes(), game_id))
+                else:
+                    conn.execute('DELETE FROM game_states WHERE id = ?', (game_id,))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return result
+
+    def delete(self, game_id):
+        self._connections.get().execute('DELETE FROM game_states WHERE id = ?', (game_id,))
+
+    def expire(self, cutoff):
+        return self._connections.get().execute(
+            'DELETE FROM game_states WHERE start_time < ?', (cutoff,)
+        ).rowcount
+
+    def __len__(self):
+        return self._connections.get().execute('SELECT COUNT(*) FROM game_states').fetchone()[0]
+
+
+def new_game_id():
+    """Return an unguessable game id: 96 random bits from ``secrets``,
+    16 URL-safe characters. Collisions are astronomically unlikely, and
+    GameStore.add still refuses a taken id so callers can retry.
+    """
+    return secrets.token_urlsafe(12)
+
+
+def create_store():
+    """Build the store selected by the GAME_STORE environment variable,
+    or return None in stateless token mode
+    """
+    backend = os.environ.get('GAME_STORE', 'memory')
+    if backend == 'token':
+        return None
+    if backend == 'memory':
+        return MemoryGameStore()
+    if backend == 'sqlite':
+        return SQLiteGameStore(os.environ.get('GAME_STORE_PATH', 'games.db'))
+    raise ValueError(f"Unknown GAME_STORE backend: {backend}")
@@ -0,0 +1,104 @@
+"""Stateless games: the whole game travels with the client.
+
+With GAME_STORE=token no instance keeps any active game. /new-game and
+every /guess hand back a token holding the game id and the packed
+``GameState``, which the next request sends back. Any instance that knows
+the key can continue the game, so serverless deploys need no shared store.
+
+The secret code must stay hidden from the player, so tokens are encrypted
+as well as signed (encrypt-then-MAC with the standard library only):
+
+    version (1) | nonce (12) | ciphertext | tag (16), base64url
+
+The keystream is keyed BLAKE2b over nonce + block counter, and the tag is
+keyed BLAKE2b over everything before it. Both keys are derived from one
+secret, GAME_TOKEN_KEY, which token mode requires: whoever knows it can
+read and forge tokens.
+
+A token is a snapshot, so a client could resend an old one to try a guess
+again. Each token carries its attempt count, and ``spend`` accepts each
+attempt of a game only once. That record is one small entry per game seen
+in the last TTL, kept per process: replays are refused by the instance that
+saw the original guess.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from game_state import GameState
+
+VERSION = 1
+NONCE_SIZE = 12
+TAG_SIZE = 16
+GAME_ID_SIZE = 16  # new_game_id() is 16 URL-safe characters
+
+
+class GameTokens:
+    def __init__(self, key, ttl=3600):
+        if isinstance(key, str):
+            key = key.encode()
+        self._cipher_key = hashlib.blake2b(key, digest_size=32, person=b'game-token-enc').digest()
+        self._mac_key = hashlib.blake2b(key, digest_size=32, person=b'game-token-mac').digest()
+        self.ttl = ttl
+        self._spent = OrderedDict()  # game_id -> (last attempt, expiry), oldest first
+        self._lock = threading.Lock()
+
+    def _xor(self, nonce, data):
+        blocks = []
+        for counter in range((len(data) + 63) // 64):
+            blocks.append(hashlib.blake2b(nonce + counter.to_bytes(4, 'big'),
+                                          key=self._cipher_key).digest())
+        stream = b''.join(blocks)[:len(data)]
+        return (int.from_bytes(data, 'big') ^ int.from_bytes(stream, 'big')).to_bytes(len(data), 'big')
+
+    def _tag(self, body):
+        return hashlib.blake2b(body, key=self._mac_key, digest_size=TAG_SIZE).digest()
+
+    def dumps(self, game_id, game):
+        """Encrypt and sign a game; returns a URL-safe token string"""
+        nonce = secrets.token_bytes(NONCE_SIZE)
+        plaintext = game_id.encode('ascii') + game.to_bytes()
+        body = bytes([VERSION]) + nonce + self._xor(nonce, plaintext)
+        return base64.urlsafe_b64encode(body + self._tag(body)).rstrip(b'=').decode('ascii')
+
+    def loads(self, token):
+        """Return (game_id, game), or None if the token is malformed,
+        forged, or older than the TTL
+        """
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        except (binascii.Error, TypeError, ValueError):
+            return None
+        if len(raw) < 1 + NONCE_SIZE + GAME_ID_SIZE + TAG_SIZE or raw[0] != VERSION:
+            return None
+        body, tag = raw[:-TAG_SIZE], raw[-TAG_SIZE:]
+        if not hmac.compare_digest(tag, self._tag(body)):
+            return None
+        plaintext = self._xor(body[1:1 + NONCE_SIZE], body[1 + NONCE_SIZE:])
+        game = GameState.from_bytes(plaintext[GAME_ID_SIZE:])
+        if game.start_time < time.time() - self.ttl:
+            return None
+        return plaintext[:GAME_ID_SIZE].decode('ascii'), game
+
+    def spend(self, game_id, attempt):
+        """Record that ``attempt`` (the count before a guess) of a game was
+        played. Returns False if it, or a later one, already was.
+        """
+        now = time.time()
+        with self._lock:
+            while self._spent and next(iter(self._spent.values()))[1] < now:
+                self._spent.popitem(last=False)
+            last = self._spent.get(game_id)
+            if last is not None and last[0] >= attempt:
+                return False
+            self._spent[game_id] = (attempt, now + self.ttl)
+            self._spent.move_to_end(game_id)
+            return True
+
+    def __len__(self):
+        return len(self._spent)
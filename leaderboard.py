@@ -0,0 +1,153 @@
+"""Incremental top-K leaderboards for the hall of fame.
+
+Entries are ranked by attempts (ascending), then by time (newest first).
+Each board keeps at most K entries in a list sorted by a precomputed
+numeric key, so a win is one ``bisect.insort`` into a list of K items:
+constant cost per win, no re-sorting, no timestamp parsing.
+
+``Snapshot`` holds the serialized /leaderboard payload.
+"""
+import bisect
+import hashlib
+import itertools
+import json
+from datetime import datetime
+
+WINDOWS = ('all', 'daily', 'weekly')
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M'
+
+
+def entry_time(entry):
+    """Numeric time of an entry. New entries carry 'time'; older ones only
+    have the minute-resolution 'timestamp' string, parsed once here.
+    """
+    if 'time' in entry:
+        return entry['time']
+    return datetime.strptime(entry['timestamp'], TIMESTAMP_FORMAT).timestamp()
+
+
+def window_bucket(window, time):
+    """Return which day/week a time falls in, or None for the all-time board"""
+    if window == 'all':
+        return None
+    date = datetime.fromtimestamp(time).date()
+    if window == 'daily':
+        return date.toordinal()
+    if window == 'weekly':
+        return date.isocalendar()[:2]
+    raise ValueError(f"Unknown window: {window}")
+
+
+class Leaderboard:
+    """Bounded top-K list of entries kept sorted on insert"""
+
+    def __init__(self, size=10):
+        self.size = size
+        self._keys = []
+        self._entries = []
+
+    def add(self, key, entry):
+        """Insert an entry; returns its position, or None if it did not
+        make the board
+        """
+        if len(self._keys) >= self.size and key >= self._keys[-1]:
+            return None
+        position = bisect.bisect(self._keys, key)
+        self._keys.insert(position, key)
+        self._entries.insert(position, entry)
+        if len(self._keys) > self.size:
+            self._keys.pop()
+            self._entries.pop()
+        return position
+
+    def clear(self):
+        self._keys.clear()
+        self._entries.clear()
+
+    def entries(self):
+        return list(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class HallOfFame:
+    """All-time, daily and weekly top-K boards plus each player's best win"""
+
+    def __init__(self, size=10):
+        self.boards = {window: Leaderboard(size) for window in WINDOWS}
+        self._buckets = dict.fromkeys(WINDOWS)
+        self._player_best = {}
+        # Breaks ties between equal (attempts, time) in favour of the newer entry
+        self._sequence = itertools.count()
+
+    def add(self, entry):
+        """Record a win. Returns the changes it made, empty if none:
+        ``{window: (position, reset)}`` for each board it entered (``reset``
+        when a new day/week cleared the board first), plus ``'player'`` if it
+        is a new personal best.
+        """
+        time = entry_time(entry)
+        key = (entry['attempts'], -time, -next(self._sequence))
+        changes = {}
+        for window, board in self.boards.items():
+            bucket = window_bucket(window, time)
+            reset = False
+            if bucket != self._buckets[window]:
+                if self._buckets[window] is not None and bucket < self._buckets[window]:
+                    continue  # Entry from an earlier day/week than the board
+                board.clear()
+                self._buckets[window] = bucket
+                reset = True
+            position = board.add(key, entry)
+            if position is not None:
+                changes[window] = (position, reset)
+        player = entry.get('player', 'Anonymous')
+        best = self._player_best.get(player)
+        if best is None or key < best[0]:
+            self._player_best[player] = (key, entry)
+            changes['player'] = True
+        return changes
+
+    def top(self, window='all', now=None):
+        """Board for a window; daily/weekly boards are empty once their
+        day/week has passed.
+        """
+        if window != 'all':
+            now = datetime.now().timestamp() if now is None else now
+            if window_bucket(window, now) != self._buckets[window]:
+                return []
+        return self.boards[window].entries()
+
+    def player_best(self, player):
+        best = self._player_best.get(player)
+        return best[1] if best else None
+
+    def retained(self):
+        """Every entry still needed to rebuild the boards, oldest first"""
+        entries = {id(entry): entry for board in self.boards.values() for entry in board.entries()}
+        for _, entry in self._player_best.values():
+            entries[id(entry)] = entry
+        return sorted(entries.values(), key=entry_time)
+
+
+class Snapshot:
+    """A JSON payload serialized once per change.
+
+    The version is a hash of the serialized body, so every worker that
+    holds the same data reports the same version and ETag. ``current`` is
+    replaced as one tuple, so readers never see a torn update.
+    """
+
+    def __init__(self):
+        self.current = (None, b'')
+
+    def publish(self, payload):
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        version = hashlib.blake2b(body, digest_size=8).hexdigest()
+        self.current = (version, body)
+        return version
+
+    @property
+    def version(self):
+        return self.current[0]
@@ -0,0 +1,271 @@
+"""Asyncio load generator for the game API.
+
+Drives simulated players through /set-nickname, /new-game and /guess
+against a locally started app (Flask's threaded dev server, gunicorn, or
+uvicorn with asgi.py) or any running deployment. Players arrive as a
+Poisson process at a configurable rate and share a pool of keep-alive
+connections. Reports p50/p95/p99 latency and requests per second for each
+endpoint.
+
+Replaces the one-session, sleep-between-guesses MastermindTester in
+test_mastermind.py for capacity measurements:
+
+    python loadtest.py --server gunicorn --workers 4 --rate 200 --duration 30
+    python loadtest.py --server uvicorn --workers 4 --rate 200 --duration 30
+    python loadtest.py --url http://localhost:10000 --rate 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from scoring import CODES
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, body=None, cookie=None):
+        """Send a request; returns (status, headers, body bytes).
+        Reconnects once if the server closed an idle connection.
+        """
+        for retry in (True, False):
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                return await self._roundtrip(method, path, body, cookie)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self.close()
+                if not retry:
+                    raise
+
+    async def _roundtrip(self, method, path, body, cookie):
+        data = json.dumps(body).encode() if body is not None else b''
+        lines = [
+            f'{method} {path} HTTP/1.1',
+            f'Host: {self.host}:{self.port}',
+            'Connection: keep-alive',
+            f'Content-Length: {len(data)}',
+        ]
+        if body is not None:
+            lines.append('Content-Type: application/json')
+        if cookie:
+            lines.append(f'Cookie: {cookie}')
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode() + data)
+        await self.writer.drain()
+
+        status_line = await self.reader.readuntil(b'\r\n')
+        if not status_line:
+            raise ConnectionError("Connection closed")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers.setdefault(name.strip().lower(), []).append(value.strip())
+        if 'content-length' in headers:
+            payload = await self.reader.readexactly(int(headers['content-length'][0]))
+        elif headers.get('transfer-encoding', [''])[0].lower() == 'chunked':
+            payload = await self._read_chunked()
+        else:
+            payload = await self.reader.read()
+            self.close()
+        if headers.get('connection', [''])[0].lower() == 'close':
+            self.close()
+        return status, headers, payload
+
+    async def _read_chunked(self):
+        chunks = []
+        while True:
+            size = int((await self.reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            if size == 0:
+                await self.reader.readuntil(b'\r\n')
+                return b''.join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readexactly(2)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class ConnectionPool:
+    """Bounded pool of keep-alive connections shared by all players"""
+
+    def __init__(self, host, port, size):
+        self._idle = asyncio.Queue()
+        for _ in range(size):
+            self._idle.put_nowait(Connection(host, port))
+
+    async def request(self, method, path, body=None, cookie=None):
+        conn = await self._idle.get()
+        try:
+            return await conn.request(method, path, body, cookie)
+        except Exception:
+            conn.close()
+            raise
+        finally:
+            self._idle.put_nowait(conn)
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def report(self, elapsed):
+        print(f"\n{'endpoint':<14}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+              f"{'p99 ms':>10}{'errors':>8}")
+        total = 0
+        for endpoint in sorted(set(self.latencies) | set(self.errors)):
+            samples = sorted(self.latencies[endpoint])
+            total += len(samples)
+            print(f"{endpoint:<14}{len(samples):>10}{len(samples) / elapsed:>10.1f}"
+                  f"{percentile(samples, 50):>10.2f}{percentile(samples, 95):>10.2f}"
+                  f"{percentile(samples, 99):>10.2f}{self.errors[endpoint]:>8}")
+        print(f"{'total':<14}{total:>10}{total / elapsed:>10.1f}")
+
+
+def percentile(samples, p):
+    if not samples:
+        return float('nan')
+    return samples[min(len(samples) - 1, int(len(samples) * p / 100))] * 1000
+
+
+class Player:
+    """One simulated player with its own session cookie"""
+
+    def __init__(self, pool, stats, rng, think_time):
+        self.pool = pool
+        self.stats = stats
+        self.rng = rng
+        self.think_time = think_time
+        self.cookie = None
+
+    async def call(self, endpoint, body=None):
+        start = time.perf_counter()
+        try:
+            status, headers, payload = await self.pool.request('POST', endpoint, body, self.cookie)
+        except Exception:
+            self.stats.errors[endpoint] += 1
+            return None
+        self.stats.latencies[endpoint].append(time.perf_counter() - start)
+        for header in headers.get('set-cookie', []):
+            self.cookie = header.split(';', 1)[0]
+        if status >= 500:
+            self.stats.errors[endpoint] += 1
+            return None
+        return json.loads(payload) if payload else {}
+
+    async def play(self):
+        await self.call('/set-nickname', {'nickname': f'load{self.rng.randrange(10 ** 6)}'})
+        if await self.call('/new-game') is None:
+            return
+        for _ in range(10):
+            if self.think_time:
+                await asyncio.sleep(self.rng.expovariate(1 / self.think_time))
+            result = await self.call('/guess', {'guess': self.rng.choice(CODES)})
+            if not result or result.get('game_over') or 'error' in result:
+                break
+
+
+async def run_load(url, rate, duration, connections, think_time, seed):
+    parts = urlsplit(url)
+    pool = ConnectionPool(parts.hostname, parts.port or 80, connections)
+    stats = Stats()
+    rng = random.Random(seed)
+    players = []
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        player = Player(pool, stats, random.Random(rng.random()), think_time)
+        players.append(asyncio.create_task(player.play()))
+        await asyncio.sleep(rng.expovariate(rate))
+    await asyncio.gather(*players)
+    stats.report(time.perf_counter() - start)
+    print(f"{len(players)} players, {connections} connections")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(kind, workers, threads):
+    """Start the app in a temporary directory; returns (process, url)"""
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    # Every simulated player comes from 127.0.0.1
+    env.setdefault('RATE_LIMIT_NEW_GAME', 'off')
+    env.setdefault('RATE_LIMIT_GUESS', 'off')
+    if kind == 'gunicorn':
+        env.setdefault('GAME_STORE', 'sqlite')
+        cmd = ['gunicorn', 'app:app', '--bind', f'127.0.0.1:{port}',
+               '--workers', str(workers), '--threads', str(threads), '--log-level', 'warning']
+    elif kind == 'uvicorn':
+        env.setdefault('GAME_STORE', 'sqlite' if workers > 1 else 'memory')
+        cmd = ['uvicorn', 'asgi:app', '--host', '127.0.0.1', '--port', str(port),
+               '--workers', str(workers), '--log-level', 'warning']
+    else:
+        cmd = [sys.executable, '-c',
+               f"from app import app; app.run(host='127.0.0.1', port={port}, threaded=True)"]
+    proc = subprocess.Popen(cmd, cwd=tempfile.mkdtemp(), env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return proc, f'http://127.0.0.1:{port}'
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f"{kind} server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Mastermind API")
+    parser.add_argument('--url', help="Target an already running server")
+    parser.add_argument('--server', choices=['flask', 'gunicorn', 'uvicorn'], default='flask',
+                        help="Server to start locally when --url is not given")
+    parser.add_argument('--workers', type=int, default=1, help="gunicorn workers")
+    parser.add_argument('--threads', type=int, default=4, help="gunicorn threads per worker")
+    parser.add_argument('--rate', type=float, default=50, help="New players per second")
+    parser.add_argument('--duration', type=float, default=10, help="Seconds to keep adding players")
+    parser.add_argument('--connections', type=int, default=32, help="Keep-alive connection pool size")
+    parser.add_argument('--think-time', type=float, default=0.0, help="Mean seconds between guesses")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    proc = None
+    url = args.url
+    if url is None:
+        proc, url = start_server(args.server, args.workers, args.threads)
+    try:
+        asyncio.run(run_load(url, args.rate, args.duration, args.connections, args.think_time, args.seed))
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,3 @@
-import random
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
@@ -6,6 +5,7 @@ from collections import deque
 import json
 import os
 from datetime import datetime
+from variants import PRESETS
 
 class MastermindGUI:
     def __init__(self, root):
@@ -15,10 +15,11 @@ class MastermindGUI:
         self.root.resizable(False, False)
         self.root.configure(bg='#2C3E50')  # Dark blue background
         
-        # Game variables
+        # Game variables: any 4 digits, repeats allowed (the 'repeats' variant)
+        self.variant = PRESETS['repeats']
         self.secret_code = self.generate_secret_code()
         self.attempts = 0
-        self.max_attempts = 10
+        self.max_attempts = self.variant.max_attempts
         
         # GUI elements
         self.create_widgets()
@@ -149,44 +150,20 @@ class MastermindGUI:
             self.last_games_display.insert(tk.END, text)
             
     def generate_secret_code(self):
-        return [random.randint(0, 9) for _ in range(4)]
+        space = self.variant.space
+        return space.digits_of(space.random_index())
 
     def evaluate_guess(self, guess):
-        correct_position = 0
-        correct_digit = 0
-        
-        # Convert guess to list of integers
-        guess = [int(d) for d in guess]
-        
-        # Check for correct positions
-        for i in range(4):
-            if guess[i] == self.secret_code[i]:
-                correct_position += 1
-        
-        # Check for correct digits in wrong positions
-        guess_copy = guess.copy()
-        secret_copy = self.secret_code.copy()
-        
-        # Remove correct positions from both lists
-        for i in range(3, -1, -1):
-            if guess_copy[i] == secret_copy[i]:
-                guess_copy.pop(i)
-                secret_copy.pop(i)
-        
-        # Count remaining correct digits in wrong positions
-        for digit in guess_copy:
-            if digit in secret_copy:
-                correct_digit += 1
-                secret_copy.remove(digit)
-        
-        return correct_position, correct_digit
+        space = self.variant.space
+        return space.score(space.index(self.secret_code), space.code_index(guess))
 
     def process_guess(self):
         guess = self.guess_entry.get()
         
         # Validate input
-        if len(guess) != 4 or not guess.isdigit():
-            messagebox.showerror("Error", "Please enter exactly 4 digits!")
+        is_valid, error_message = self.variant.space.validate(guess)
+        if not is_valid:
+            messagebox.showerror("Error", f"{error_message}!")
             return
         
         self.attempts += 1
@@ -212,9 +189,10 @@ class MastermindGUI:
         self.guess_entry.delete(0, tk.END)
         
         # Check win/lose conditions
-        if correct_pos == 4 or self.attempts >= self.max_attempts:
+        won = correct_pos == self.variant.space.length
+        if won or self.attempts >= self.max_attempts:
             game_summary = {
-                'won': correct_pos == 4,
+                'won': won,
                 'attempts': self.attempts,
                 'secret_code': ''.join(map(str, self.secret_code)),
                 'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M')
@@ -223,7 +201,7 @@ class MastermindGUI:
             self.save_game_history()
             self.update_last_games_display()
             
-            if correct_pos == 4:
+            if won:
                 messagebox.showinfo("Congratulations! 🎉", f"You won in {self.attempts} attempts!")
             else:
                 secret_code_str = ''.join(map(str, self.secret_code))
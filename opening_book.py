@@ -0,0 +1,84 @@
+"""Opening book for the first two solver moves.
+
+The first two moves are the only ones where the solver has to score the
+whole code space, so they are searched exhaustively once, offline, and
+stored in opening_book.json:
+
+    {"minimax": {"first": "1234", "replies": {"+1 -2": "5236", ...}}, ...}
+
+Build (or rebuild) the book with:
+    python opening_book.py
+"""
+import json
+import os
+
+from scoring import (
+    CODES, FEEDBACK_CLASSES, WINNING_FEEDBACK, decode_feedback, format_feedback,
+)
+import solver
+
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'opening_book.json')
+
+_book = None
+
+
+def search(candidates, strategy):
+    """Exhaustive search: score every code against the candidates"""
+    if len(candidates) <= 2:
+        return int(candidates[0])
+    pool = solver.all_candidates()
+    return int(pool[solver.rank_guesses(pool, candidates, strategy)])
+
+
+def build_book(strategy):
+    candidates = solver.all_candidates()
+    first = search(candidates, strategy)
+    counts = solver.partition_counts([first], candidates)[0]
+    replies = {}
+    for feedback_code in range(FEEDBACK_CLASSES):
+        if not counts[feedback_code] or feedback_code == WINNING_FEEDBACK:
+            continue
+        remaining = solver.filter_candidates(candidates, first, feedback_code)
+        replies[format_feedback(*decode_feedback(feedback_code))] = CODES[search(remaining, strategy)]
+    return {'first': CODES[first], 'replies': replies}
+
+
+def save_book(path=BOOK_FILE):
+    book = {strategy: build_book(strategy) for strategy in solver.STRATEGIES}
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(book, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+    return book
+
+
+def load_book(path=BOOK_FILE):
+    """Load the book on first use; a missing or broken file means no book"""
+    global _book
+    if _book is None:
+        try:
+            with open(path, 'r') as f:
+                _book = json.load(f)
+        except (OSError, ValueError):
+            _book = {}
+    return _book
+
+
+def lookup(guesses, strategy='minimax'):
+    """Return the book move for a game's guesses, or None when out of book"""
+    if len(guesses) > 1:
+        return None
+    entry = load_book().get(strategy)
+    if not entry:
+        return None
+    if not guesses:
+        return entry['first']
+    if guesses[0]['guess'] != entry['first']:
+        return None
+    return entry['replies'].get(guesses[0]['feedback'])
+
+
+if __name__ == '__main__':
+    for strategy, entry in save_book().items():
+        print(f"{strategy}: first {entry['first']}, {len(entry['replies'])} replies")
+    print(f"Wrote {BOOK_FILE}")
@@ -0,0 +1,219 @@
+"""Append-only JSON Lines persistence for finished games.
+
+Requests only put records on a queue. A background writer thread appends
+them to the log in batches and fsyncs on an interval, so request latency no
+longer includes disk I/O. Logs are compacted at startup: the records worth
+keeping are written to a temporary file which then atomically replaces the
+log.
+
+Appends and compaction take an advisory file lock, so several gunicorn
+workers can share one log without interleaving or losing records.
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+
+from metrics import Histogram
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+WRITE_SECONDS = Histogram(
+    'mastermind_log_write_seconds',
+    'Background writer time per JSON Lines batch write or fsync',
+    labels=('log', 'op')
+)
+BATCH_RECORDS = Histogram(
+    'mastermind_log_batch_records', 'Records per JSON Lines batch write',
+    labels=('log',), buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+
+
+class FileLock:
+    """Exclusive advisory lock on ``<path>.lock``"""
+
+    def __init__(self, path):
+        self.path = path + '.lock'
+        self._file = None
+        # flock is per open file, so threads of one process serialize here
+        self._thread_lock = threading.Lock()
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        self._file = open(self.path, 'a')
+        if fcntl:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+        self._thread_lock.release()
+
+
+class JsonlLog:
+    """A JSON Lines file written by a background thread.
+
+    ``flush_interval`` is how long the writer collects records into one
+    batch; ``fsync_interval`` is the minimum time between fsyncs.
+    """
+
+    def __init__(self, path, flush_interval=0.5, fsync_interval=2.0):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self._queue = queue.Queue()
+        self._lock = FileLock(path)
+        self._last_fsync = 0.0
+        self._dirty = False
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def read(self):
+        """Return every record in the log, skipping a torn last line"""
+        records = []
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return records
+
+    def tail(self, count, block_size=65536):
+        """Return the last ``count`` records, reading the file backwards"""
+        try:
+            with open(self.path, 'rb') as f:
+                end = f.seek(0, os.SEEK_END)
+                data = b''
+                # Two lines more than asked for: the first may be partial,
+                # the last torn
+                while end > 0 and data.count(b'\n') <= count + 1:
+                    start = max(0, end - block_size)
+                    f.seek(start)
+                    data = f.read(end - start) + data
+                    end = start
+        except FileNotFoundError:
+            return []
+        records = []
+        for line in reversed(data.splitlines()):
+            if len(records) == count:
+                break
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        return records[::-1]
+
+    def compact(self, reduce):
+        """Rewrite the log as ``reduce(records)`` and return the result.
+        The new contents are fsynced to a temp file, then swapped in with
+        os.replace, so a crash leaves either the old or the new log.
+        """
+        with self._lock:
+            records = reduce(self.read())
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                for record in records:
+                    f.write(json.dumps(record) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        return records
+
+    def append(self, record):
+        """Queue a record for the writer thread; never blocks on disk"""
+        self._ensure_writer()
+        self._queue.put(record)
+
+    def flush(self):
+        """Block until every queued record is written and fsynced"""
+        self._queue.join()
+        if self._dirty:
+            self._sync()
+
+    def _ensure_writer(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name=f'jsonl-writer:{self.path}', daemon=True
+                    )
+                    self._thread.start()
+                    atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            try:
+                # Wake up to fsync a batch that was written but not synced
+                batch = [self._queue.get(timeout=self.fsync_interval if self._dirty else None)]
+            except queue.Empty:
+                self._sync()
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                print(f"Error writing {self.path}: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        data = ''.join(json.dumps(record) + '\n' for record in batch)
+        BATCH_RECORDS.observe(len(batch), self.name)
+        # Reopen per batch so appends follow the file across compactions
+        with self._lock, open(self.path, 'a') as f:
+            with WRITE_SECONDS.time(self.name, 'write'):
+                f.write(data)
+                f.flush()
+            self._dirty = True
+            if time.monotonic() - self._last_fsync >= self.fsync_interval:
+                self._fsync(f)
+
+    def _sync(self):
+        try:
+            with self._lock, open(self.path, 'a') as f:
+                self._fsync(f)
+        except Exception as e:
+            print(f"Error syncing {self.path}: {e}")
+
+    def _fsync(self, f):
+        with WRITE_SECONDS.time(self.name, 'fsync'):
+            os.fsync(f.fileno())
+        self._last_fsync = time.monotonic()
+        self._dirty = False
+
+
+def migrate_json(log, legacy_path, newest_first=False):
+    """Seed an empty log from a legacy whole-file JSON list, once.
+    Logs are oldest-first; pass ``newest_first`` for lists stored the
+    other way round.
+    """
+    if os.path.exists(log.path) or not os.path.exists(legacy_path):
+        return
+    try:
+        with open(legacy_path, 'r') as f:
+            records = json.load(f)
+    except (OSError, ValueError):
+        return
+    if isinstance(records, list):
+        log.compact(lambda _: records[::-1] if newest_first else records)
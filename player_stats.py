@@ -0,0 +1,140 @@
+"""Per-player running statistics.
+
+Each nickname has one aggregate record that is updated in O(1) when a game
+finishes: games and wins, a histogram of winning attempts, the elapsed time
+sum plus a fixed-bucket histogram (for the median), and win streaks.
+Reads never touch history, so /stats/<nickname> costs the same after a
+million games as after one.
+
+Records are plain JSON dicts. The app appends each finished game to a
+JSON Lines log as a small delta, not the updated record: workers each hold
+their own copy of the aggregates, and deltas from all of them add up where
+snapshots would overwrite each other. Startup folds the deltas into the
+records and compacts the log to one record per player.
+"""
+import bisect
+import threading
+
+MAX_ATTEMPTS = 10
+# Upper bounds (seconds) of the elapsed time buckets; the last is open-ended
+ELAPSED_BOUNDS = (1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 240, 300,
+                  450, 600, 900, 1200, 1800, 2700, 3600)
+
+
+def new_record(player):
+    return {
+        'player': player,
+        'games': 0,
+        'wins': 0,
+        'attempts': [0] * MAX_ATTEMPTS,  # wins by attempts, index 0 = 1 attempt
+        'elapsed_sum': 0,
+        'elapsed_hist': [0] * (len(ELAPSED_BOUNDS) + 1),
+        'streak': 0,
+        'best_streak': 0,
+        'last_played': None,
+    }
+
+
+def update_record(record, game_summary, time):
+    """Fold one finished game into a player's record"""
+    record['games'] += 1
+    elapsed = max(0, game_summary.get('elapsed_time', 0))
+    record['elapsed_sum'] += elapsed
+    record['elapsed_hist'][bisect.bisect_left(ELAPSED_BOUNDS, elapsed)] += 1
+    if game_summary['won']:
+        record['wins'] += 1
+        attempts = min(max(game_summary['attempts'], 1), MAX_ATTEMPTS)
+        record['attempts'][attempts - 1] += 1
+        record['streak'] += 1
+        record['best_streak'] = max(record['best_streak'], record['streak'])
+    else:
+        record['streak'] = 0
+    record['last_played'] = time
+    return record
+
+
+def median_elapsed(hist):
+    """Median elapsed time, interpolated within its histogram bucket"""
+    total = sum(hist)
+    if not total:
+        return None
+    half = total / 2
+    seen = 0
+    for i, count in enumerate(hist):
+        if count and seen + count >= half:
+            low = ELAPSED_BOUNDS[i - 1] if i else 0
+            if i == len(ELAPSED_BOUNDS):
+                return low
+            return round(low + (ELAPSED_BOUNDS[i] - low) * (half - seen) / count, 1)
+        seen += count
+    return None
+
+
+def summarize(record):
+    """The /stats response for a record"""
+    games, wins = record['games'], record['wins']
+    attempts = record['attempts']
+    return {
+        'player': record['player'],
+        'games_played': games,
+        'wins': wins,
+        'losses': games - wins,
+        'win_rate': round(wins / games, 4) if games else 0.0,
+        'attempts_histogram': {str(i + 1): count for i, count in enumerate(attempts)},
+        'mean_attempts': round(sum((i + 1) * c for i, c in enumerate(attempts)) / wins, 2) if wins else None,
+        'mean_elapsed_time': round(record['elapsed_sum'] / games, 1) if games else None,
+        'median_elapsed_time': median_elapsed(record['elapsed_hist']),
+        'current_streak': record['streak'],
+        'longest_streak': record['best_streak'],
+        'last_played': record['last_played'],
+    }
+
+
+class PlayerStats:
+    """In-memory aggregates for every player, keyed by nickname"""
+
+    def __init__(self):
+        self._records = {}
+        self._lock = threading.Lock()
+
+    def load(self, records):
+        """Replay logged records and game deltas in order: a record
+        replaces the player's aggregates, a delta is folded into them.
+        Returns the records to keep, one per player.
+        """
+        for record in records:
+            player = record.get('player')
+            if player is None:
+                continue
+            if 'games' in record:
+                self._records[player] = record
+            else:
+                self._fold(player, record, record.get('time'))
+        return list(self._records.values())
+
+    def _fold(self, player, game_summary, time):
+        record = self._records.get(player)
+        if record is None:
+            record = self._records[player] = new_record(player)
+        update_record(record, game_summary, time)
+
+    def record(self, player, game_summary, time):
+        """Add a finished game; returns the delta to log for it"""
+        with self._lock:
+            self._fold(player, game_summary, time)
+        return {
+            'player': player,
+            'won': game_summary['won'],
+            'attempts': game_summary['attempts'],
+            'elapsed_time': game_summary.get('elapsed_time', 0),
+            'time': time,
+        }
+
+    def get(self, player):
+        """The /stats response for a player, or None if they never played"""
+        with self._lock:
+            record = self._records.get(player)
+            return summarize(record) if record else None
+
+    def __len__(self):
+        return len(self._records)
@@ -0,0 +1,66 @@
+"""Sampling profiler for a running server.
+
+Set PROFILE_INTERVAL (seconds between samples, e.g. 0.005) to start it
+with the app. A daemon thread periodically snapshots every thread's stack
+with ``sys._current_frames`` and counts identical stacks, so the cost is
+one stack walk per thread per sample and nothing on the request path.
+GET /debug/profile returns the counts in the folded format used by
+flamegraph.pl and speedscope.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.005, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = 0
+        self._stacks = Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while True:
+            time.sleep(self.interval)
+            stacks = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                names = []
+                while frame is not None and len(names) < self.max_depth:
+                    code = frame.f_code
+                    names.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                    frame = frame.f_back
+                stacks.append(';'.join(reversed(names)))
+            with self._lock:
+                self._stacks.update(stacks)
+                self.samples += 1
+
+    def folded(self):
+        """One 'frame;frame;frame count' line per distinct stack, hottest first"""
+        with self._lock:
+            stacks = self._stacks.most_common()
+        return ''.join(f'{stack} {count}\n' for stack, count in stacks)
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+
+
+def start_from_environ():
+    """Start a profiler if PROFILE_INTERVAL is set, else return None"""
+    interval = os.environ.get('PROFILE_INTERVAL')
+    if not interval:
+        return None
+    return SamplingProfiler(float(interval)).start()
@@ -0,0 +1,154 @@
+"""Token-bucket rate limiting for /new-game and /guess.
+
+Each key (a client address) has a bucket of ``burst`` tokens that refills
+at ``rate`` tokens per second; a request takes one token or is refused
+with the time until one is available. ``MemoryRateLimiter`` keeps buckets
+in a process-local dict, ``SQLiteRateLimiter`` in a table that every
+worker sharing the file sees, like the two game stores.
+
+A missing bucket is a full one, so buckets that have refilled can be
+dropped at any time; that keeps the limiter's own memory bounded.
+
+Limits are set with RATE_LIMIT_NEW_GAME and RATE_LIMIT_GUESS as
+``count/seconds`` (e.g. ``60/60``) or ``off``. RATE_LIMIT_STORE picks the
+backend ('memory' or 'sqlite', default: sqlite when GAME_STORE is sqlite);
+the SQLite limiter uses GAME_STORE_PATH.
+"""
+import os
+import threading
+import time
+
+from concurrency import SQLiteConnections, StripedLock
+
+DEFAULT_LIMITS = {
+    'new_game': '60/60',
+    'guess': '600/60',
+}
+
+
+def parse_limit(value):
+    """'count/seconds' -> (rate per second, burst), or None for 'off'"""
+    if not value or value.strip().lower() == 'off':
+        return None
+    count, _, seconds = value.partition('/')
+    count, seconds = float(count), float(seconds or 1)
+    if count <= 0 or seconds <= 0:
+        raise ValueError(f"Invalid rate limit: {value}")
+    return count / seconds, count
+
+
+def limits_from_environ():
+    """{endpoint: (rate, burst)} for every endpoint with a limit"""
+    limits = {}
+    for endpoint, default in DEFAULT_LIMITS.items():
+        limit = parse_limit(os.environ.get(f'RATE_LIMIT_{endpoint.upper()}', default))
+        if limit:
+            limits[endpoint] = limit
+    return limits
+
+
+class RateLimiter:
+    """Interface shared by the limiter backends"""
+
+    def allow(self, key, rate, burst):
+        """Take a token from ``key``'s bucket. Returns (allowed,
+        retry_after seconds)
+        """
+        raise NotImplementedError
+
+
+class MemoryRateLimiter(RateLimiter):
+    """Process-local buckets: (tokens, updated, full_at) per key.
+
+    When there are more than ``max_keys`` buckets, full ones are dropped;
+    if that does not free enough (too many distinct clients at once),
+    clients without a bucket are refused rather than growing the dict.
+    """
+
+    def __init__(self, max_keys=100_000, stripes=64):
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._locks = StripedLock(stripes)
+        self._prune_lock = threading.Lock()
+
+    def allow(self, key, rate, burst):
+        now = time.monotonic()
+        if len(self._buckets) >= self.max_keys and key not in self._buckets:
+            self._prune(now)
+            if len(self._buckets) >= self.max_keys:
+                return False, 1.0
+        with self._locks.for_key(key):
+            bucket = self._buckets.get(key)
+            tokens = burst if bucket is None else min(burst, bucket[0] + (now - bucket[1]) * rate)
+            if tokens < 1:
+                return False, (1 - tokens) / rate
+            tokens -= 1
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+        return True, 0.0
+
+    def _prune(self, now):
+        if not self._prune_lock.acquire(blocking=False):
+            return  # Another thread is already pruning
+        try:
+            for key, bucket in list(self._buckets.items()):
+                if bucket[2] <= now:
+                    self._buckets.pop(key, None)
+        finally:
+            self._prune_lock.release()
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """Buckets in a WAL-mode SQLite table shared by every worker"""
+
+    def __init__(self, path='games.db', prune_interval=60):
+        self.path = path
+        self.prune_interval = prune_interval
+        self._next_prune = 0.0
+        self._connections = SQLiteConnections(path)
+        conn = self._connections.get()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS rate_limits ('
+            ' key TEXT PRIMARY KEY,'
+            ' tokens REAL NOT NULL,'
+            ' updated REAL NOT NULL,'
+            ' full_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS rate_limits_full_at ON rate_limits (full_at)')
+
+    def allow(self, key, rate, burst):
+        now = time.time()  # Wall clock: shared between processes
+        conn = self._connections.get()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM rate_limits WHERE key = ?',
+                               (key,)).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + max(0.0, now - row[1]) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+                conn.execute(
+                    'INSERT OR REPLACE INTO rate_limits (key, tokens, updated, full_at)'
+                    ' VALUES (?, ?, ?, ?)', (key, tokens, now, now + (burst - tokens) / rate)
+                )
+            if now >= self._next_prune:
+                self._next_prune = now + self.prune_interval
+                conn.execute('DELETE FROM rate_limits WHERE full_at <= ?', (now,))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+
+def create_limiter():
+    """Build the limiter selected by RATE_LIMIT_STORE"""
+    default = 'sqlite' if os.environ.get('GAME_STORE') == 'sqlite' else 'memory'
+    backend = os.environ.get('RATE_LIMIT_STORE', default)
+    if backend == 'memory':
+        return MemoryRateLimiter()
+    if backend == 'sqlite':
+        return SQLiteRateLimiter(os.environ.get('GAME_STORE_PATH', 'games.db'))
+    raise ValueError(f"Unknown RATE_LIMIT_STORE backend: {backend}")
@@ -0,0 +1,249 @@
+"""Multiplayer race rooms: many players cracking one shared secret.
+
+A room holds the secret once, with its feedback row: ``row[guess]`` is the
+feedback byte of any guess against the secret, so scoring a guess is one
+lookup and each racer is a small ``Racer`` record, not a game of its own.
+For the classic rules the row is a view into scoring.feedback_table(), so
+rooms share the table's memory instead of copying it.
+
+Joins and guesses are published to the room's own ``Broadcaster`` as small
+diffs, serialized once for every subscriber (see broadcast.py). The full
+standings are rebuilt and serialized at most once per change, for
+GET /rooms/<id>.
+
+Rooms live in the process that created them, like MemoryGameStore. Each
+room has its own lock, and the registry lock is only held to add or
+expire rooms.
+"""
+import heapq
+import itertools
+import json
+import secrets
+import threading
+import time
+
+import numpy as np
+
+from broadcast import Broadcaster
+from scoring import format_feedback
+from variants import CLASSIC
+
+# Every room keeps a feedback row with one byte per code
+MAX_ROOM_CODES = 100_000
+
+
+def secret_row(space, secret):
+    """Feedback bytes of every code against ``secret``, for scalar lookups"""
+    table = space.table()
+    if table is not None:
+        row = table[secret]
+    else:
+        row = space.feedback_matrix([secret], np.arange(space.size))[0]
+    return memoryview(row)
+
+
+class Racer:
+    __slots__ = ('name', 'joined', 'attempts', 'best', 'finished', 'place')
+
+    def __init__(self, name, joined):
+        self.name = name
+        self.joined = joined
+        self.attempts = 0
+        self.best = -1  # Best feedback byte; bytes order like (pos, digits)
+        self.finished = None  # Seconds from joining to the last guess
+        self.place = None  # Finishing position of a winner
+
+    def standing(self, space):
+        return {
+            'player': self.name,
+            'attempts': self.attempts,
+            'best': format_feedback(*space.decode_feedback(self.best)) if self.attempts else None,
+            'won': self.place is not None,
+            'finished': self.finished is not None,
+            'time': self.finished,
+            'place': self.place
+        }
+
+
+class Room:
+    """One race: a shared secret and the players racing for it"""
+
+    def __init__(self, room_id, created, variant=CLASSIC, secret=None, max_players=50):
+        self.room_id = room_id
+        self.created = created
+        self.variant = variant
+        self.secret = variant.space.random_index() if secret is None else secret
+        self.max_players = max_players
+        self.events = Broadcaster(size=64)
+        self.racers = {}  # player id -> Racer
+        self.version = 0
+        self._row = secret_row(variant.space, self.secret)
+        self._names = set()
+        self._places = itertools.count(1)
+        self._unfinished = 0
+        self._standings = (None, b'')
+        self._lock = threading.Lock()
+
+    @property
+    def race_over(self):
+        return bool(self.racers) and not self._unfinished
+
+    def join(self, name, now):
+        """Add a racer, named ``name`` or 'Player N'. Returns the racer's
+        player id, or None when the room is full or the race is over.
+        """
+        with self._lock:
+            # A late joiner would reopen a race whose secret is public
+            if len(self.racers) >= self.max_players or self.race_over:
+                return None
+            base = name or f'Player {len(self.racers) + 1}'
+            name = base
+            for n in itertools.count(2):
+                if name not in self._names:
+                    break
+                name = f'{base} ({n})'
+            player_id = secrets.token_urlsafe(8)
+            self.racers[player_id] = Racer(name, now)
+            self._names.add(name)
+            self._unfinished += 1
+            self.version += 1
+            self.events.publish('join', {'player': name, 'players': len(self.racers),
+                                         'version': self.version})
+        return player_id
+
+    def guess(self, player_id, guess, now):
+        """Score a racer's guess. Returns (result, status)"""
+        space = self.variant.space
+        is_valid, error_message = space.validate(guess)
+        if not is_valid:
+            return {'error': error_message}, 400
+        try:
+            feedback_byte = self._row[space.code_index(guess)]
+        except ValueError:
+            return {'error': 'Invalid guess'}, 400
+        correct_pos, correct_digits = space.decode_feedback(feedback_byte)
+        with self._lock:
+            racer = self.racers.get(player_id)
+            if racer is None:
+                return {'error': 'Join the room first'}, 403
+            if racer.finished is not None:
+                return {'error': 'You have already finished this race'}, 400
+            racer.attempts += 1
+            racer.best = max(racer.best, feedback_byte)
+            won = correct_pos == space.length
+            if won or racer.attempts >= self.variant.max_attempts:
+                racer.finished = int(now - racer.joined)
+                racer.place = next(self._places) if won else None
+                self._unfinished -= 1
+            self.version += 1
+            update = racer.standing(space)
+            update['version'] = self.version
+            self.events.publish('guess', update)
+            race_over = self.race_over
+            if race_over:
+                self.events.publish('race_over', {'version': self.version,
+                                                  'secret_code': space.code_string(self.secret)})
+        result = {
+            'guess': guess,
+            'feedback': format_feedback(correct_pos, correct_digits),
+            'attempt': update['attempts'],
+            'finished': update['finished'],
+            'won': won,
+            'place': update['place'],
+            # Racers out of attempts only see it once everyone is done,
+            # or a second session could win with it
+            'secret_code': space.code_string(self.secret) if won or race_over else None
+        }
+        return result, 200
+
+    def standings(self):
+        """(version, JSON body) of the full standings, rebuilt once per change"""
+        version, body = self._standings
+        if version == self.version:
+            return version, body
+        space = self.variant.space
+        with self._lock:
+            version = self.version
+            # Winners by place, then everyone else by best feedback and
+            # fewest attempts, racers still playing before those out of tries
+            racers = sorted(self.racers.values(), key=lambda r: (
+                r.place is None, r.place or 0, r.finished is not None, -r.best, r.attempts))
+            payload = {
+                'room_id': self.room_id,
+                'variant': self.variant.describe(),
+                'players': len(racers),
+                'max_players': self.max_players,
+                'race_over': self.race_over,
+                'version': version,
+                'standings': [racer.standing(space) for racer in racers]
+            }
+            if payload['race_over']:
+                payload['secret_code'] = space.code_string(self.secret)
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        self._standings = (version, body)
+        return version, body
+
+
+class Rooms:
+    """Registry of live rooms, expired ``ttl`` seconds after creation
+    through a min-heap, as in MemoryGameStore
+    """
+
+    def __init__(self, max_rooms=10_000, max_players=50, ttl=3600):
+        self.max_rooms = max_rooms
+        self.max_players = max_players
+        self.ttl = ttl
+        self._rooms = {}
+        self._expiry = []
+        self._lock = threading.Lock()
+
+    def create(self, now, variant=CLASSIC):
+        """Open a room. Returns None when ``max_rooms`` are open"""
+        if variant.space.size > MAX_ROOM_CODES:
+            raise ValueError(f"Race rooms support at most {MAX_ROOM_CODES:,} codes")
+        self.expire(now - self.ttl)
+        room_id = secrets.token_urlsafe(6)
+        room = Room(room_id, now, variant, max_players=self.max_players)
+        with self._lock:
+            if self.max_rooms and len(self._rooms) >= self.max_rooms:
+                return None
+            while room_id in self._rooms:
+                room_id = room.room_id = secrets.token_urlsafe(6)
+            self._rooms[room_id] = room
+            heapq.heappush(self._expiry, (now, room_id))
+        return room
+
+    def get(self, room_id):
+        return self._rooms.get(room_id)
+
+    def expire(self, cutoff):
+        """Close rooms created before ``cutoff``; returns how many"""
+        closed = []
+        with self._lock:
+            while self._expiry and self._expiry[0][0] < cutoff:
+                _, room_id = heapq.heappop(self._expiry)
+                closed.append(self._rooms.pop(room_id))
+        for room in closed:
+            # Ends every subscriber's /events stream
+            room.events.close()
+        return len(closed)
+
+    def start_sweeper(self, interval=60):
+        """Close expired rooms from a daemon thread every ``interval``
+        seconds, as GameStore.start_sweeper does for games, so rooms do
+        not wait for the next create()
+        """
+        def sweep():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.expire(time.time() - self.ttl)
+                except Exception as e:
+                    print(f"Error expiring rooms: {e}")
+
+        thread = threading.Thread(target=sweep, name='room-sweeper', daemon=True)
+        thread.start()
+        return thread
+
+    def __len__(self):
+        return len(self._rooms)
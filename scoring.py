@@ -0,0 +1,169 @@
+"""Scoring engine for the web game.
+
+Every valid code (4 distinct digits, no leading zero) is enumerated once and
+given a compact integer index. Feedback for any (secret, guess) pair is then a
+lookup in a packed uint8 table instead of per-call list surgery.
+
+A feedback byte encodes (+pos, -digit) as ``pos * 5 + digit`` so the 14
+possible feedback classes fit in ``range(FEEDBACK_CLASSES)``, which keeps
+partition counting in the solver a single ``bincount``.
+
+The table is 20 MB, so it ships precomputed in feedback_table.npy and is
+memory-mapped on first use: loading costs a page fault per row read instead
+of a build per process, and gunicorn workers share the pages. Rebuild it
+after changing the encoding with:
+    python scoring.py
+"""
+import os
+from itertools import permutations
+
+import numpy as np
+
+CODE_LENGTH = 4
+FEEDBACK_CLASSES = (CODE_LENGTH + 1) * 5
+WINNING_FEEDBACK = CODE_LENGTH * 5
+
+# All valid codes in ascending order, following the validate_guess rules
+CODES = [
+    ''.join(p) for p in permutations('0123456789', CODE_LENGTH)
+    if p[0] != '0'
+]
+NUM_CODES = len(CODES)
+
+# codes as an (N, 4) digit matrix and as 10-bit digit masks
+CODE_DIGITS = (np.frombuffer(''.join(CODES).encode(), dtype=np.uint8)
+               .reshape(NUM_CODES, CODE_LENGTH) - ord('0')).astype(np.int8)
+CODE_INDEX = dict(zip(CODES, range(NUM_CODES)))
+DIGITS_INDEX = dict(zip(map(tuple, CODE_DIGITS.tolist()), range(NUM_CODES)))
+CODE_MASKS = (1 << CODE_DIGITS.astype(np.int16)).sum(axis=1).astype(np.int16)
+
+_POPCOUNT = np.array([bin(i).count('1') for i in range(1024)], dtype=np.uint8)
+_DECODED = [divmod(code, 5) for code in range(FEEDBACK_CLASSES)]
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'feedback_table.npy')
+_table = None
+_table_bytes = None
+
+
+def encode_feedback(correct_pos, correct_digits):
+    return correct_pos * 5 + correct_digits
+
+
+def decode_feedback(code):
+    return divmod(int(code), 5)
+
+
+def format_feedback(correct_pos, correct_digits):
+    """Render feedback the way the game shows it: '+1 -2', '+3', '-1' or '0'"""
+    if correct_pos == 0 and correct_digits == 0:
+        return "0"
+    feedback = ""
+    if correct_pos > 0:
+        feedback += f"+{correct_pos} "
+    if correct_digits > 0:
+        feedback += f"-{correct_digits}"
+    return feedback.strip()
+
+
+def parse_feedback(feedback):
+    """Inverse of format_feedback, returns (correct_pos, correct_digits)"""
+    correct_pos = correct_digits = 0
+    for part in feedback.split():
+        if part.startswith('+'):
+            correct_pos = int(part[1:])
+        elif part.startswith('-'):
+            correct_digits = int(part[1:])
+    return correct_pos, correct_digits
+
+
+def code_index(code):
+    """Return the index of a code given as a string or a list of digits.
+    Raises ValueError for codes outside the valid code space, as
+    CodeSpace.code_index does.
+    """
+    try:
+        if isinstance(code, str):
+            return CODE_INDEX[code]
+        return DIGITS_INDEX[tuple(code)]
+    except KeyError:
+        raise ValueError("Code outside the code space") from None
+
+
+def build_feedback_table(rows=slice(None)):
+    """Compute the NUM_CODES x NUM_CODES feedback table, or just ``rows``.
+    Since digits never repeat, common digits are the popcount of the
+    intersection of digit masks, and -digit is that minus +pos.
+    """
+    common = _POPCOUNT[CODE_MASKS[rows, None] & CODE_MASKS[None, :]]
+    positions = np.zeros(common.shape, dtype=np.uint8)
+    for i in range(CODE_LENGTH):
+        column = CODE_DIGITS[:, i]
+        positions += column[rows, None] == column[None, :]
+    return positions * 4 + common
+
+
+def save_feedback_table(path=TABLE_FILE):
+    table = build_feedback_table()
+    tmp_path = path + '.tmp.npy'
+    np.save(tmp_path, table)
+    os.replace(tmp_path, path)
+    return table
+
+
+def load_feedback_table(path=TABLE_FILE):
+    """Memory-map the shipped table; None when it is missing or stale"""
+    try:
+        table = np.load(path, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    if table.shape != (NUM_CODES, NUM_CODES) or table.dtype != np.uint8:
+        return None
+    # A spot check of a few rows catches a table built with another encoding
+    rows = [0, NUM_CODES // 2, NUM_CODES - 1]
+    if not np.array_equal(table[rows], build_feedback_table(rows)):
+        return None
+    return table.view(np.ndarray)
+
+
+def feedback_table():
+    """Return the shared feedback table, loading it on first use: mapped
+    from feedback_table.npy, or built in memory when the file is unusable.
+    ``table[secret, guess]`` is the encoded feedback byte; the table is
+    symmetric so rows can be read either way.
+    """
+    global _table, _table_bytes
+    if _table is None:
+        table = load_feedback_table()
+        _table = table if table is not None else build_feedback_table()
+        # Scalar lookups through a flat memoryview avoid numpy's per-item
+        # overhead without keeping a second copy of the table
+        _table_bytes = memoryview(_table.reshape(-1))
+    return _table
+
+
+def score(secret_index, guess_index):
+    """Return (correct_pos, correct_digits) for two code indices"""
+    if _table_bytes is None:
+        feedback_table()
+    return _DECODED[_table_bytes[secret_index * NUM_CODES + guess_index]]
+
+
+def score_codes(secret, guess):
+    """Score two codes of any length and alphabet, repeats allowed.
+    Reference implementation; variants.py scores other code spaces.
+    """
+    correct_position = sum(s == g for s, g in zip(secret, guess))
+    counts = [0] * 10
+    for digit in secret:
+        counts[int(digit)] += 1
+    common = 0
+    for digit in guess:
+        digit = int(digit)
+        if counts[digit]:
+            counts[digit] -= 1
+            common += 1
+    return correct_position, common - correct_position
+
+
+if __name__ == '__main__':
+    save_feedback_table()
+    print(f"Wrote {TABLE_FILE} ({NUM_CODES} x {NUM_CODES})")
@@ -0,0 +1,199 @@
+"""Headless simulation engine for bulk games.
+
+Plays games in-process with the web game's rules (generate_secret_code,
+validate_guess, evaluate_guess) and pluggable guessing strategies, spread
+over a multiprocessing pool, and reports win rate and the distribution of
+attempts.
+
+    python simulate.py --games 1000000 --strategy random sequential ascending solver
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import time
+
+import numpy as np
+
+from game_rules import generate_secret_code, validate_guess, evaluate_guess
+from scoring import CODES, format_feedback
+import opening_book
+import solver
+
+MAX_ATTEMPTS = 10
+
+# Fixed guess lists from test_mastermind.py
+SEQUENTIAL_GUESSES = [
+    '1234', '1235', '1236', '1237', '1238', '1239', '1245', '1246',
+    '1247', '1248', '1249', '1256', '1257', '1258', '1259', '1267'
+]
+ASCENDING_GUESSES = [
+    '1234', '1235', '1236', '1237', '1238', '1239',
+    '2345', '2346', '2347', '2348', '2349',
+    '3456', '3457', '3458', '3459',
+    '4567', '4568', '4569'
+]
+
+
+class Strategy:
+    """Base class: reset() at the start of a game, then guess()/observe()
+    alternate until the game ends.
+    """
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def reset(self):
+        pass
+
+    def guess(self, attempt):
+        raise NotImplementedError
+
+    def observe(self, guess, correct_pos, correct_digits):
+        pass
+
+
+class RandomStrategy(Strategy):
+    """A uniformly random valid code every move"""
+
+    def guess(self, attempt):
+        return self.rng.choice(CODES)
+
+
+class SequenceStrategy(Strategy):
+    """Walks a fixed list of guesses"""
+
+    guesses = SEQUENTIAL_GUESSES
+
+    def guess(self, attempt):
+        return self.guesses[attempt % len(self.guesses)]
+
+
+class AscendingStrategy(SequenceStrategy):
+    guesses = ASCENDING_GUESSES
+
+
+# Solver moves memoized per worker process, keyed on (method, history)
+_solver_moves = {}
+
+
+class SolverStrategy(Strategy):
+    """Opening book, then the candidate-space solver.
+
+    The solver is deterministic given the game so far, so its moves are
+    memoized on the (guess, feedback) history. The decision tree has a few
+    thousand nodes; once a worker has seen them every game is lookups only,
+    and the candidate set is only rebuilt on a miss.
+    """
+
+    method = 'minimax'
+
+    def reset(self):
+        self.history = []
+        self.key = (self.method,)
+
+    def guess(self, attempt):
+        move = _solver_moves.get(self.key)
+        if move is None:
+            move = opening_book.lookup(self.history, self.method)
+            if move is None:
+                candidates = solver.candidates_from_history(self.history)
+                move = CODES[solver.suggest_guess(candidates, self.method)]
+            _solver_moves[self.key] = move
+        return move
+
+    def observe(self, guess, correct_pos, correct_digits):
+        feedback = format_feedback(correct_pos, correct_digits)
+        self.key += (guess, feedback)
+        self.history.append({'guess': guess, 'feedback': feedback})
+
+
+class EntropySolverStrategy(SolverStrategy):
+    method = 'entropy'
+
+
+STRATEGIES = {
+    'random': RandomStrategy,
+    'sequential': SequenceStrategy,
+    'ascending': AscendingStrategy,
+    'solver': SolverStrategy,
+    'entropy': EntropySolverStrategy,
+}
+
+
+def play_game(strategy, max_attempts=MAX_ATTEMPTS):
+    """Play one game; returns the winning attempt number, or 0 for a loss"""
+    secret_code = generate_secret_code()
+    strategy.reset()
+    for attempt in range(max_attempts):
+        guess = strategy.guess(attempt)
+        is_valid, error_message = validate_guess(guess)
+        if not is_valid:
+            raise ValueError(f"{type(strategy).__name__} made an invalid guess {guess}: {error_message}")
+        correct_pos, correct_digits = evaluate_guess(secret_code, guess)
+        if correct_pos == 4:
+            return attempt + 1
+        strategy.observe(guess, correct_pos, correct_digits)
+    return 0
+
+
+def run_batch(args):
+    """Worker entry point: play ``games`` games, return attempt counts
+    (index 0 counts losses, index n counts wins in n attempts).
+    """
+    name, games, seed = args
+    # Each worker needs its own random stream, including the module-level
+    # one generate_secret_code draws from. The strategy's stream must not
+    # repeat the secrets' one, or the random strategy guesses each secret
+    random.seed(seed)
+    strategy = STRATEGIES[name](random.Random(random.getrandbits(64)))
+    counts = np.zeros(MAX_ATTEMPTS + 1, dtype=np.int64)
+    for _ in range(games):
+        counts[play_game(strategy)] += 1
+    return counts
+
+
+def simulate(name, games, processes=None, batch_size=10_000, seed=None):
+    """Play ``games`` games with one strategy across a process pool"""
+    seed = random.SystemRandom().randrange(2 ** 32) if seed is None else seed
+    batches = [
+        (name, min(batch_size, games - start), seed + i)
+        for i, start in enumerate(range(0, games, batch_size))
+    ]
+    counts = np.zeros(MAX_ATTEMPTS + 1, dtype=np.int64)
+    with multiprocessing.Pool(processes) as pool:
+        for batch_counts in pool.imap_unordered(run_batch, batches):
+            counts += batch_counts
+    return counts
+
+
+def report(name, counts, elapsed):
+    games = int(counts.sum())
+    wins = int(counts[1:].sum())
+    print(f"\n{name}: {games:,} games in {elapsed:.1f}s ({games / elapsed:,.0f} games/s)")
+    print(f"  win rate: {wins / games:.2%}")
+    if wins:
+        mean = (counts[1:] * np.arange(1, MAX_ATTEMPTS + 1)).sum() / wins
+        print(f"  mean attempts to win: {mean:.3f}")
+    for attempts in range(1, MAX_ATTEMPTS + 1):
+        share = counts[attempts] / games
+        print(f"  {attempts:2d}: {counts[attempts]:>10,} {share:7.2%} {'#' * round(share * 50)}")
+    print(f"  lost: {counts[0]:>8,} {counts[0] / games:7.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate Mastermind games in bulk")
+    parser.add_argument('--games', type=int, default=100_000)
+    parser.add_argument('--strategy', nargs='+', default=['random', 'solver'], choices=sorted(STRATEGIES))
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    for name in args.strategy:
+        start = time.perf_counter()
+        counts = simulate(name, args.games, args.processes, seed=args.seed)
+        report(name, counts, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
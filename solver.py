@@ -0,0 +1,107 @@
+"""Candidate-space solver built on the scoring engine.
+
+The codes still consistent with a game's history are kept as a NumPy array
+of code indices. Each guess filters that array with one vectorized table
+lookup, and the next guess is chosen by partitioning the candidates into
+feedback classes (minimax or max-entropy).
+
+Every function takes the game's ``CodeSpace`` (see variants.py), the
+classic one by default; other variants score blocks through
+``space.feedback_matrix`` instead of the classic table.
+"""
+import numpy as np
+
+from scoring import parse_feedback
+from variants import CLASSIC
+
+CLASSIC_SPACE = CLASSIC.space
+
+STRATEGIES = ('minimax', 'entropy')
+
+# Upper bound on guess x candidate cells scored per suggestion. Keeps a
+# suggestion in the low milliseconds even when every code is still possible.
+WORK_BUDGET = 400_000
+
+
+def all_candidates(space=CLASSIC_SPACE):
+    return np.arange(space.size, dtype=np.int32)
+
+
+def filter_candidates(candidates, guess_index, feedback_code, space=CLASSIC_SPACE):
+    """Keep the candidates that would have produced this feedback"""
+    table = space.table()
+    if table is not None:
+        row = table[guess_index, candidates]
+    else:
+        row = space.feedback_matrix([guess_index], candidates)[0]
+    return candidates[row == feedback_code]
+
+
+def candidates_from_history(guesses, space=CLASSIC_SPACE):
+    """Candidates consistent with a game's ``guesses`` list
+    (dicts with 'guess' and 'feedback' strings, as stored by /guess).
+    """
+    candidates = all_candidates(space)
+    for entry in guesses:
+        feedback_code = space.encode_feedback(*parse_feedback(entry['feedback']))
+        candidates = filter_candidates(candidates, space.code_index(entry['guess']),
+                                       feedback_code, space)
+    return candidates
+
+
+def partition_counts(guess_indices, candidates, space=CLASSIC_SPACE):
+    """Return a (len(guesses), feedback classes) matrix of class sizes"""
+    classes_per_guess = space.feedback_classes
+    classes = space.feedback_matrix(guess_indices, candidates).astype(np.int32)
+    classes += (np.arange(len(guess_indices), dtype=np.int32) * classes_per_guess)[:, None]
+    counts = np.bincount(classes.ravel(), minlength=len(guess_indices) * classes_per_guess)
+    return counts.reshape(len(guess_indices), classes_per_guess)
+
+
+def guess_pool(candidates, budget=WORK_BUDGET, space=CLASSIC_SPACE):
+    """Pick which guesses to score within the work budget.
+    Non-candidate guesses can split the space better, so the full code space
+    is used when affordable; otherwise an evenly strided sample of candidates.
+    """
+    if len(candidates) * space.size <= budget:
+        return all_candidates(space)
+    size = max(1, budget // len(candidates))
+    if size >= len(candidates):
+        return candidates
+    step = len(candidates) / size
+    return candidates[(np.arange(size) * step).astype(np.int32)]
+
+
+def rank_guesses(guess_indices, candidates, strategy='minimax', space=CLASSIC_SPACE):
+    """Return the position in ``guess_indices`` of the best guess"""
+    counts = partition_counts(guess_indices, candidates, space)
+    is_candidate = np.isin(guess_indices, candidates)
+    if strategy == 'minimax':
+        # Smallest worst-case class; among ties prefer a guess that can win
+        return int(np.argmin(counts.max(axis=1) * 2 - is_candidate))
+    if strategy == 'entropy':
+        p = counts / len(candidates)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            entropy = -np.where(p > 0, p * np.log2(p), 0.0).sum(axis=1)
+        return int(np.argmax(entropy + is_candidate * 1e-9))
+    raise ValueError(f"Unknown strategy: {strategy}")
+
+
+def suggest_guess(candidates, strategy='minimax', space=CLASSIC_SPACE):
+    """Return the code index of the suggested next guess"""
+    if len(candidates) == 0:
+        raise ValueError("No candidates left")
+    if len(candidates) <= 2:
+        return int(candidates[0])
+    pool = guess_pool(candidates, space=space)
+    return int(pool[rank_guesses(pool, candidates, strategy, space)])
+
+
+def hint(guesses, strategy='minimax', book_move=None, space=CLASSIC_SPACE):
+    """Return (suggested guess string, remaining candidate count).
+    A ``book_move`` from the opening book skips the search.
+    """
+    candidates = candidates_from_history(guesses, space)
+    if book_move is not None:
+        return book_move, len(candidates)
+    return space.code_string(suggest_guess(candidates, strategy, space)), len(candidates)
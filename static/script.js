@@ -1,5 +1,7 @@
 let gameId = null;
 let lastGames = [];
+let leaderboardVersion = null;
+let hallOfFame = [];
 let playerNickname = '';
 let timerInterval = null;
 let startTime = null;
@@ -8,6 +10,8 @@ document.addEventListener('DOMContentLoaded', () => {
     // Show nickname modal first
     showNicknameModal();
     
+    subscribeToLeaderboard();
+    
     startNewGame();
     
     document.getElementById('guess-input').addEventListener('keypress', (e) => {
@@ -56,7 +60,6 @@ async function startNewGame() {
         });
         const data = await response.json();
         gameId = data.game_id;
-        lastGames = data.last_games || [];
         
         // Reset UI
         document.getElementById('history').innerHTML = '';
@@ -65,10 +68,7 @@ async function startNewGame() {
         document.getElementById('guess-input').focus();
         
         // Update displays
-        updateLastGamesDisplay();
-        if (data.hall_of_fame) {
-            updateHallOfFame(data.hall_of_fame);
-        }
+        await refreshLeaderboard(data.leaderboard_version);
 
         // Reset number checker
         document.querySelectorAll('.number-item').forEach(item => {
@@ -82,6 +82,56 @@ async function startNewGame() {
     }
 }
 
+async function refreshLeaderboard(version) {
+    // Only refetch when the server reports a new version; the browser
+    // revalidates with the ETag, so an unchanged payload costs a 304
+    if (version && version === leaderboardVersion) {
+        return;
+    }
+    try {
+        const response = await fetch('/leaderboard');
+        const data = await response.json();
+        leaderboardVersion = response.headers.get('ETag')?.replace(/"/g, '') || version;
+        lastGames = data.last_games || [];
+        hallOfFame = data.hall_of_fame || [];
+        updateLastGamesDisplay();
+        updateHallOfFame(hallOfFame);
+    } catch (error) {
+        console.error('Error loading leaderboard:', error);
+    }
+}
+
+function subscribeToLeaderboard() {
+    // Live history and hall of fame diffs; EventSource reconnects on its
+    // own and resumes from Last-Event-ID. Serverless deployments turn the
+    // stream off; the leaderboard_version check keeps the boards current
+    if (!window.EventSource || document.body.dataset.liveEvents === 'off') {
+        return;
+    }
+    const source = new EventSource('/events');
+    
+    source.addEventListener('history', (e) => {
+        const data = JSON.parse(e.data);
+        lastGames = [data.game, ...lastGames].slice(0, data.keep);
+        leaderboardVersion = data.version;
+        updateLastGamesDisplay();
+    });
+    
+    source.addEventListener('hall_of_fame', (e) => {
+        const data = JSON.parse(e.data);
+        const board = data.boards.find(b => b.window === 'all');
+        leaderboardVersion = data.version;
+        if (board) {
+            hallOfFame.splice(board.position, 0, data.entry);
+            hallOfFame = hallOfFame.slice(0, data.size);
+            updateHallOfFame(hallOfFame);
+        }
+    });
+    
+    // Too far behind to apply diffs: refetch the whole snapshot
+    source.addEventListener('resync', () => refreshLeaderboard());
+}
+
 function updateLastGamesDisplay() {
     const lastGamesList = document.getElementById('last-games-list');
     lastGamesList.innerHTML = '';
@@ -154,6 +204,7 @@ async function submitGuess() {
             
             if (data.game_over) {
                 stopTimer();
+                refreshLeaderboard(data.leaderboard_version);
                 if (data.won) {
                     const timeStr = document.getElementById('timer').textContent;
                     alert(`Congratulations! You won in ${data.attempt} attempts!\nTime: ${timeStr}`);
@@ -162,10 +213,6 @@ async function submitGuess() {
                 }
                 await startNewGame();
             }
-            
-            if (data.hall_of_fame) {
-                updateHallOfFame(data.hall_of_fame);
-            }
         } else {
             if (data.error === 'No active game. Please start a new game.') {
                 await startNewGame();
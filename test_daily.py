@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from daily import day_of
+from variants import CLASSIC
+
+
+def daily_code(app_module):
+    return CLASSIC.space.code_string(app_module.daily.secret(day_of(datetime.now().timestamp())))
+
+
+def test_daily_secret_stays_off_the_leaderboard(app_module, client):
+    code = daily_code(app_module)
+    client.post('/set-nickname', json={'nickname': 'daily-winner'})
+    assert client.post('/new-game', json={'daily': True}).status_code == 200
+    result = client.post('/guess', json={'guess': code}).get_json()
+    assert result['won']
+
+    response = client.get('/leaderboard')
+    assert code not in response.get_data(as_text=True)
+    assert all(entry['player'] != 'daily-winner' for entry in response.get_json()['hall_of_fame'])
@@ -0,0 +1,38 @@
+from variants import CLASSIC
+
+
+def open_room(app_module, client):
+    room_id = client.post('/rooms').get_json()['room_id']
+    return room_id, CLASSIC.space.code_string(app_module.rooms.get(room_id).secret)
+
+
+def wrong_guess(secret):
+    return next(code for code in ('1234', '5678') if code != secret)
+
+
+def test_no_joins_once_the_race_is_over(app_module, client):
+    room_id, secret = open_room(app_module, client)
+    assert client.post(f'/rooms/{room_id}/guess', json={'guess': secret}).get_json()['won']
+    assert client.get(f'/rooms/{room_id}').get_json()['race_over']
+
+    late = app_module.app.test_client()
+    response = late.post(f'/rooms/{room_id}/join')
+    assert response.status_code == 409
+    assert client.get(f'/rooms/{room_id}').get_json()['race_over']
+
+
+def test_secret_is_hidden_from_losers_until_the_race_is_over(app_module, client):
+    room_id, secret = open_room(app_module, client)
+    rival = app_module.app.test_client()
+    assert rival.post(f'/rooms/{room_id}/join').status_code == 200
+
+    for _ in range(CLASSIC.max_attempts):
+        result = client.post(f'/rooms/{room_id}/guess', json={'guess': wrong_guess(secret)}).get_json()
+    assert result['finished'] and not result['won']
+    assert result['secret_code'] is None
+    assert 'secret_code' not in client.get(f'/rooms/{room_id}').get_json()
+
+    # The last racer finishing ends the race and reveals it
+    result = rival.post(f'/rooms/{room_id}/guess', json={'guess': secret}).get_json()
+    assert result['won'] and result['place'] == 1
+    assert client.get(f'/rooms/{room_id}').get_json()['secret_code'] == secret
@@ -0,0 +1,14 @@
+from variants import CLASSIC
+
+
+def test_stats_include_the_players_best_game(app_module, client):
+    client.post('/set-nickname', json={'nickname': 'best-game'})
+    client.post('/new-game')
+    with client.session_transaction() as session:
+        game = app_module.games.get(session['current_game'])
+    code = CLASSIC.space.code_string(game.secret)
+    assert client.post('/guess', json={'guess': code}).get_json()['won']
+
+    stats = client.get('/stats/best-game').get_json()
+    assert stats['best_game']['attempts'] == 1
+    assert stats['best_game']['secret_code'] == code
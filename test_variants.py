@@ -0,0 +1,44 @@
+import pytest
+
+import variants
+from variants import variant_from_key, variant_from_spec
+
+# Custom spaces over SMALL_CUSTOM_CODES codes
+LARGE_SPECS = [
+    {'length': 7, 'colors': 10},
+    {'length': 6, 'colors': 10, 'repeats': True},
+    {'length': 7, 'colors': 9},
+    {'length': 6, 'colors': 9, 'repeats': True},
+    {'length': 8, 'colors': 5, 'repeats': True},
+]
+
+
+def test_games_with_the_same_rules_share_a_space():
+    spec = {'length': 3, 'colors': 6, 'repeats': True, 'leading_zero': True}
+    first = variant_from_spec(spec)
+    assert variant_from_spec(spec).space is first.space
+    assert variant_from_key(first.key).space is first.space
+
+
+def test_large_custom_spaces_are_bounded(monkeypatch):
+    monkeypatch.setattr(variants, '_custom_spaces', variants.weakref.WeakValueDictionary())
+    monkeypatch.setattr(variants, '_kept', {})
+    held = [variant_from_spec(spec) for spec in LARGE_SPECS[:variants.LARGE_CUSTOM_SPACES]]
+    with pytest.raises(ValueError):
+        variant_from_spec(LARGE_SPECS[-1])
+    # A game already in play always gets its space back
+    assert variant_from_key("custom:8:5:1:0:10").space.size == 5 ** 8 - 5 ** 7
+    assert [variant_from_spec(spec).space for spec in LARGE_SPECS[:len(held)]] == \
+        [variant.space for variant in held]
+
+
+@pytest.mark.parametrize('spec', [
+    {'length': 4.9},
+    {'colors': '8'},
+    {'max_attempts': True},
+    {'repeats': 'false'},
+    {'leading_zero': 1},
+])
+def test_custom_specs_need_real_json_types(spec):
+    with pytest.raises(ValueError):
+        variant_from_spec(spec)
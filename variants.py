@@ -0,0 +1,401 @@
+"""Game variants: code length, alphabet size and repetition rules.
+
+A ``CodeSpace`` is one rule set: ``length`` symbols drawn from the digits
+``0 .. colors-1``, with or without repeats, with or without a leading
+zero. Codes are numbered in ascending order and a code's index is computed
+arithmetically (mixed-radix rank with repeats, Lehmer rank without), so no
+space needs a list of every code string or a code -> index dict.
+
+Feedback uses digit-count vectors: +pos counts equal positions and the
+common symbols are ``sum(min(secret_counts, guess_counts))``. Each code is
+packed into two 64-bit words, built on first use for the whole space: its
+digits, 4 bits per position, and its counts in unary, ``length`` bits per
+symbol (1 without repeats) with the first ``count`` of them set. Equal
+positions are the zero nibbles of ``a ^ b`` and the common symbols are
+``popcount(counts_a & counts_b)``, so scoring a pair is a few integer ops
+and the solver scores whole blocks (guesses x candidates) vectorized.
+Spaces small enough also get a full N x N table, built on first use (a
+tighter limit for custom spaces, of which only a few large ones are in
+use at a time); the
+classic space shares the one in scoring.py, so its indices, table and
+feedback bytes are unchanged.
+
+A feedback byte is ``pos * (length + 1) + digits``, which for length 4 is
+the ``pos * 5 + digits`` encoding of scoring.py.
+
+A ``Variant`` is a code space plus ``max_attempts``. /new-game picks one of
+``PRESETS`` by name or builds a custom one with ``variant_from_spec``.
+"""
+import random
+import threading
+import time
+import weakref
+from itertools import chain, permutations
+from math import perm
+
+import numpy as np
+
+import scoring
+
+MAX_LENGTH = 8
+MAX_COLORS = 10
+MAX_ATTEMPTS = 30
+MAX_CODES = 2_000_000
+# Spaces with at most this many table cells get a full feedback table;
+# custom spaces, which anyone can request, only up to CUSTOM_TABLE_CELLS
+TABLE_CELLS = 32_000_000
+CUSTOM_TABLE_CELLS = 4_000_000
+# Custom spaces up to SMALL_CUSTOM_CODES are kept once built: about 40 MB
+# of codes and tables for all of them. At most LARGE_CUSTOM_SPACES larger
+# ones are in use at a time, each kept LARGE_CUSTOM_IDLE seconds after its
+# last use unless games still hold it
+SMALL_CUSTOM_CODES = 50_000
+LARGE_CUSTOM_SPACES = 4
+LARGE_CUSTOM_IDLE = 600
+# Cells scored per vectorized block
+BLOCK_CELLS = 1 << 20
+
+if hasattr(np, 'bitwise_count'):
+    _popcount = np.bitwise_count
+else:
+    # NumPy < 2: look up 16 bits at a time
+    _POPCOUNT16 = np.array([bin(i).count('1') for i in range(1 << 16)], dtype=np.uint8)
+
+    def _popcount(words):
+        words = np.ascontiguousarray(words)
+        return _POPCOUNT16[words.view(np.uint16)].reshape(words.shape + (4,)).sum(
+            axis=-1, dtype=np.uint8)
+
+
+class CodeSpace:
+    def __init__(self, length, colors, repeats, leading_zero, table_cells=TABLE_CELLS):
+        self.length = length
+        self.colors = colors
+        self.repeats = repeats
+        self.leading_zero = leading_zero
+        if repeats:
+            total, self._offset = colors ** length, colors ** (length - 1)
+        else:
+            total, self._offset = perm(colors, length), perm(colors - 1, length - 1)
+            # Lehmer rank place values
+            self._radix = [perm(colors - 1 - i, length - 1 - i) for i in range(length)]
+        if leading_zero:
+            self._offset = 0
+        self.size = total - self._offset
+        self.feedback_classes = (length + 1) ** 2
+        self.winning_feedback = length * (length + 1)
+        self.classic = (length, colors, repeats, leading_zero) == (4, 10, False, False)
+        # Unary counts need this many bits per symbol
+        self._count_width = length if repeats else 1
+        if colors * self._count_width > 64 or length > 16:
+            raise ValueError("Code space too wide to pack into 64-bit words")
+        # Bit 0 of every position's nibble
+        self._nibble_low = sum(1 << (4 * i) for i in range(length))
+        self._table_cells = table_cells
+        self._lock = threading.RLock()
+        self._words = None
+        self._table = None
+
+    # Codes and indices
+
+    def index(self, digits):
+        """Index of a code given as a sequence of ints. Raises ValueError
+        for codes outside the space.
+        """
+        if self.classic:
+            try:
+                return scoring.DIGITS_INDEX[tuple(digits)]
+            except KeyError:
+                raise ValueError("Code outside the code space") from None
+        length, colors = self.length, self.colors
+        if len(digits) != length or any(not 0 <= d < colors for d in digits):
+            raise ValueError("Code outside the code space")
+        if not self.leading_zero and digits[0] == 0:
+            raise ValueError("Code outside the code space")
+        index = 0
+        if self.repeats:
+            for d in digits:
+                index = index * colors + d
+        else:
+            if len(set(digits)) != length:
+                raise ValueError("Code outside the code space")
+            for i, d in enumerate(digits):
+                smaller_unused = d - sum(1 for used in digits[:i] if used < d)
+                index += smaller_unused * self._radix[i]
+        return index - self._offset
+
+    def digits_of(self, index):
+        """Inverse of index(): the code's digits as a list of ints"""
+        if not 0 <= index < self.size:
+            raise ValueError("Index outside the code space")
+        index += self._offset
+        if self.repeats:
+            digits = []
+            for _ in range(self.length):
+                index, d = divmod(index, self.colors)
+                digits.append(d)
+            return digits[::-1]
+        available = list(range(self.colors))
+        digits = []
+        for radix in self._radix:
+            d, index = divmod(index, radix)
+            digits.append(available.pop(d))
+        return digits
+
+    def code_index(self, code):
+        """Index of a code string; raises ValueError for invalid codes"""
+        if self.classic:
+            try:
+                return scoring.CODE_INDEX[code]
+            except KeyError:
+                raise ValueError("Code outside the code space") from None
+        if not (code.isascii() and code.isdigit()):
+            raise ValueError("Code outside the code space")
+        return self.index([int(ch) for ch in code])
+
+    def code_string(self, index):
+        if self.classic:
+            return scoring.CODES[index]
+        return ''.join(map(str, self.digits_of(index)))
+
+    def random_index(self, rng=random):
+        return rng.randrange(self.size)
+
+    def validate(self, guess):
+        """Check a guess against the rules. Returns (is_valid, error_message)"""
+        # Valid classic codes are exactly the keys of CODE_INDEX
+        if self.classic and type(guess) is str and guess in scoring.CODE_INDEX:
+            return True, ""
+        # isdigit() alone also accepts non-ASCII digits such as '١٢٣٤'
+        if not isinstance(guess, str) or len(guess) != self.length or \
+                not (guess.isascii() and guess.isdigit()):
+            if self.colors == 10:
+                return False, f"Please enter exactly {self.length} digits"
+            return False, f"Please enter exactly {self.length} digits from 0 to {self.colors - 1}"
+        # Digit characters order like their values
+        if self.colors < 10 and max(guess) >= str(self.colors):
+            return False, f"Digits must be between 0 and {self.colors - 1}"
+        if not self.leading_zero and guess[0] == '0':
+            return False, "Number cannot start with 0"
+        if not self.repeats and len(set(guess)) != self.length:
+            return False, "Digits cannot repeat"
+        return True, ""
+
+    # Feedback
+
+    def encode_feedback(self, correct_pos, correct_digits):
+        return correct_pos * (self.length + 1) + correct_digits
+
+    def decode_feedback(self, code):
+        return divmod(int(code), self.length + 1)
+
+    def score(self, secret_index, guess_index):
+        """(correct_pos, correct_digits) for two code indices"""
+        if self.classic:
+            return scoring.score(secret_index, guess_index)
+        digit_words, count_words = self.code_words()
+        diff = digit_words.item(secret_index) ^ digit_words.item(guess_index)
+        diff = (diff | diff >> 1 | diff >> 2 | diff >> 3) & self._nibble_low
+        correct_pos = self.length - diff.bit_count()
+        common = (count_words.item(secret_index) & count_words.item(guess_index)).bit_count()
+        return correct_pos, common - correct_pos
+
+    def digit_matrix(self):
+        """(N, length) int8 digits of every code"""
+        length, colors = self.length, self.colors
+        if self.repeats:
+            codes = np.arange(self._offset, self._offset + self.size, dtype=np.int64)
+            powers = colors ** np.arange(length - 1, -1, -1, dtype=np.int64)
+            return ((codes[:, None] // powers) % colors).astype(np.int8)
+        # permutations() yields codes in ascending order
+        total = perm(colors, length)
+        flat = np.fromiter(chain.from_iterable(permutations(range(colors), length)),
+                           dtype=np.int8, count=total * length)
+        return flat.reshape(total, length)[self._offset:]
+
+    def code_words(self):
+        """(digit_words, count_words): every code packed into two uint64
+        arrays, built on first use
+        """
+        if self._words is None:
+            with self._lock:
+                if self._words is None:
+                    self._words = self._pack(self.digit_matrix())
+        return self._words
+
+    def _pack(self, digits):
+        digit_words = np.zeros(len(digits), dtype=np.uint64)
+        count_words = np.zeros(len(digits), dtype=np.uint64)
+        for i in range(self.length):
+            column = digits[:, i].astype(np.uint64)
+            digit_words |= column << np.uint64(4 * i)
+            # The k-th occurrence of a symbol sets that symbol's k-th bit
+            seen = (digits[:, :i] == digits[:, i:i + 1]).sum(axis=1).astype(np.uint64)
+            count_words |= np.uint64(1) << (column * np.uint64(self._count_width) + seen)
+        return digit_words, count_words
+
+    def table(self):
+        """Full feedback table for small spaces (None otherwise), built on
+        first use; the classic space shares scoring.feedback_table()
+        """
+        if self.classic:
+            return scoring.feedback_table()
+        if self.size * self.size > self._table_cells:
+            return None
+        if self._table is None:
+            with self._lock:
+                if self._table is None:
+                    everything = np.arange(self.size)
+                    self._table = self._compute(everything, everything)
+        return self._table
+
+    def feedback_matrix(self, guesses, candidates):
+        """uint8 feedback bytes, shape (len(guesses), len(candidates))"""
+        table = self.table()
+        if table is not None:
+            return table[np.ix_(guesses, candidates)]
+        return self._compute(np.asarray(guesses), np.asarray(candidates))
+
+    def _compute(self, guesses, candidates):
+        digit_words, count_words = self.code_words()
+        other_digits, other_counts = digit_words[candidates], count_words[candidates]
+        low = np.uint64(self._nibble_low)
+        out = np.empty((len(guesses), len(candidates)), dtype=np.uint8)
+        block = max(1, BLOCK_CELLS // max(1, len(candidates)))
+        for start in range(0, len(guesses), block):
+            rows = guesses[start:start + block]
+            diff = digit_words[rows][:, None] ^ other_digits
+            diff = (diff | diff >> np.uint64(1) | diff >> np.uint64(2) | diff >> np.uint64(3)) & low
+            common = _popcount(count_words[rows][:, None] & other_counts)
+            # pos * (length + 1) + (common - pos), pos = length - differing positions
+            out[start:start + block] = (self.length - _popcount(diff)) * self.length + common
+        return out
+
+
+# Every custom space still referenced, by a game or by _kept, so games
+# with the same rules share one space instead of each pinning its own
+_custom_spaces = weakref.WeakValueDictionary()
+_kept = {}  # rules -> (space, last use)
+_custom_lock = threading.Lock()
+
+
+def code_space(length, colors, repeats, leading_zero, new=True):
+    """The shared CodeSpace for a rule set, so codes and tables are built
+    once: a preset's own, or the registered custom space. Raises
+    ValueError for a ``new`` large custom space while LARGE_CUSTOM_SPACES
+    are in use; games already in play pass ``new=False`` and always get one.
+    """
+    rules = (length, colors, repeats, leading_zero)
+    for preset in PRESETS.values():
+        space = preset.space
+        if (space.length, space.colors, space.repeats, space.leading_zero) == rules:
+            return space
+    now = time.monotonic()
+    with _custom_lock:
+        space = _custom_spaces.get(rules)
+        if space is None:
+            space = CodeSpace(*rules, table_cells=CUSTOM_TABLE_CELLS)
+            if space.size > SMALL_CUSTOM_CODES:
+                for key, (kept, used) in list(_kept.items()):
+                    if kept.size > SMALL_CUSTOM_CODES and now - used > LARGE_CUSTOM_IDLE:
+                        del _kept[key]
+                large = sum(1 for kept in _custom_spaces.values() if kept.size > SMALL_CUSTOM_CODES)
+                if new and large >= LARGE_CUSTOM_SPACES:
+                    raise ValueError("Too many large custom variants in play; try a smaller one "
+                                     "or a preset")
+            _custom_spaces[rules] = space
+        _kept[rules] = (space, now)
+    return space
+
+
+class Variant:
+    def __init__(self, name, space, max_attempts):
+        self.name = name
+        self.space = space
+        self.max_attempts = max_attempts
+
+    @property
+    def key(self):
+        """Compact id stored with each game; preset name or custom rules"""
+        if self.name in PRESETS:
+            return self.name
+        space = self.space
+        return (f"custom:{space.length}:{space.colors}:{int(space.repeats)}:"
+                f"{int(space.leading_zero)}:{self.max_attempts}")
+
+    def describe(self):
+        space = self.space
+        return {
+            'name': self.name,
+            'length': space.length,
+            'colors': space.colors,
+            'repeats': space.repeats,
+            'leading_zero': space.leading_zero,
+            'max_attempts': self.max_attempts,
+            'codes': space.size,
+        }
+
+
+PRESETS = {
+    # The web game: 4 distinct digits, no leading zero
+    'classic': Variant('classic', CodeSpace(4, 10, False, False), 10),
+    # The Tk game's rules: any 4 digits
+    'repeats': Variant('repeats', CodeSpace(4, 10, True, True), 10),
+    'five': Variant('five', CodeSpace(5, 10, False, False), 12),
+    'six': Variant('six', CodeSpace(6, 10, True, True), 14),
+}
+CLASSIC = PRESETS['classic']
+
+
+def variant_from_spec(spec, new=True):
+    """Build a variant from a /new-game request: None or a preset name, or
+    a dict with 'length', 'colors', 'repeats', 'leading_zero' and
+    'max_attempts'. Raises ValueError for anything out of range; ``new``
+    as in code_space.
+    """
+    if spec is None:
+        return CLASSIC
+    if isinstance(spec, str):
+        if spec not in PRESETS:
+            raise ValueError(f"Unknown variant: {spec}")
+        return PRESETS[spec]
+    if not isinstance(spec, dict):
+        raise ValueError("Variant must be a preset name or an object")
+    length = spec.get('length', 4)
+    colors = spec.get('colors', 10)
+    max_attempts = spec.get('max_attempts', 10)
+    # int() would take 4.9, "4" and true; bool is an int subclass
+    if any(type(value) is not int for value in (length, colors, max_attempts)):
+        raise ValueError("Variant length, colors and max_attempts must be integers")
+    # Default to the classic rules; bool() would read "false" as True
+    repeats = spec.get('repeats', False)
+    leading_zero = spec.get('leading_zero', False)
+    if not isinstance(repeats, bool) or not isinstance(leading_zero, bool):
+        raise ValueError("Variant repeats and leading_zero must be true or false")
+    if not 2 <= length <= MAX_LENGTH:
+        raise ValueError(f"Length must be between 2 and {MAX_LENGTH}")
+    if not 2 <= colors <= MAX_COLORS:
+        raise ValueError(f"Colors must be between 2 and {MAX_COLORS}")
+    if not repeats and colors < length:
+        raise ValueError("Without repeats, colors must be at least the length")
+    if not 1 <= max_attempts <= MAX_ATTEMPTS:
+        raise ValueError(f"Max attempts must be between 1 and {MAX_ATTEMPTS}")
+    size = colors ** length if repeats else perm(colors, length)
+    if size > MAX_CODES:
+        raise ValueError(f"Code space too large (max {MAX_CODES:,} codes)")
+    space = code_space(length, colors, repeats, leading_zero, new=new)
+    for preset in PRESETS.values():
+        if preset.space is space and preset.max_attempts == max_attempts:
+            return preset
+    return Variant('custom', space, max_attempts)
+
+
+def variant_from_key(key):
+    """Inverse of Variant.key"""
+    if key in PRESETS:
+        return PRESETS[key]
+    _, length, colors, repeats, leading_zero, max_attempts = key.split(':')
+    return variant_from_spec({
+        'length': int(length), 'colors': int(colors), 'repeats': repeats == '1',
+        'leading_zero': leading_zero == '1', 'max_attempts': int(max_attempts),
+    }, new=False)